@@ -0,0 +1,213 @@
+"""Persistent sidecar index for the append-only indiv_activities_full.csv
+
+The pipeline only needs three things from the existing activities before
+appending a batch: the last Serial, which Activity IDs already exist, and
+which athletes are known. Reading the whole CSV for them costs O(database)
+per run. ActivityIndex keeps them in a sidecar file next to the CSV:
+
+    ../indiv_activities_full.csv.idx.npz
+        ids          sorted Activity IDs (dedupe via np.searchsorted)
+        id_rows      row number of each entry in `ids`
+        offsets      byte offset of every row in the CSV
+        athlete_ids  sorted unique Athlete IDs
+        fingerprint  hash of the header and last indexed row
+        last_serial, csv_size, csv_mtime_ns
+
+The CSV stays the source of truth. When it has grown since the sidecar was
+written and the header and last indexed row are still where they were
+(rows appended by another tool), only the new bytes are indexed. If it
+shrank or was rewritten in place, the index is rebuilt from scratch.
+
+Usage (from Get_Data/):
+    index = ActivityIndex.load()
+    new_rows = index.append(clean_df)   # dedupes, appends, updates the sidecar
+"""
+import csv
+import hashlib
+import io
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ACTIVITIES_CSV = os.path.join(ROOT_DIR, 'indiv_activities_full.csv')
+
+
+def _scan_records(path: str, start: int):
+    """Yield (offset, raw bytes) for each CSV record from byte `start`
+
+    A record ends at a newline only when it holds an even number of quote
+    characters, so quoted Descriptions spanning several lines stay one row.
+    """
+    with open(path, 'rb') as f:
+        f.seek(start)
+        offset, record, quotes = start, b'', 0
+        for line in f:
+            record += line
+            quotes += line.count(b'"')
+            if quotes % 2 == 0:
+                yield offset, record
+                offset += len(record)
+                record, quotes = b'', 0
+        if record.strip():
+            yield offset, record
+
+
+class ActivityIndex:
+    """Activity IDs, row offsets and last Serial of the activities CSV"""
+
+    def __init__(self, csv_path: str = ACTIVITIES_CSV):
+        self.csv_path = csv_path
+        self.sidecar_path = csv_path + '.idx.npz'
+        self.ids = np.empty(0, dtype='int64')
+        self.id_rows = np.empty(0, dtype='int64')
+        self.offsets = np.empty(0, dtype='int64')
+        self.athlete_ids = np.empty(0, dtype='int64')
+        self.last_serial = 0
+        self.csv_size = 0
+        self.csv_mtime_ns = 0
+        self.columns = []
+        self.fingerprint = ''
+
+    @classmethod
+    def load(cls, csv_path: str = ACTIVITIES_CSV) -> 'ActivityIndex':
+        """Open the sidecar, catching up on (or rebuilding for) any CSV changes"""
+        index = cls(csv_path)
+        stat = os.stat(csv_path)
+        if os.path.exists(index.sidecar_path):
+            with np.load(index.sidecar_path, allow_pickle=False) as data:
+                for name in ('ids', 'id_rows', 'offsets', 'athlete_ids'):
+                    setattr(index, name, data[name])
+                index.last_serial = int(data['last_serial'])
+                index.csv_size = int(data['csv_size'])
+                index.csv_mtime_ns = int(data['csv_mtime_ns'])
+                index.columns = data['columns'].tolist()
+                index.fingerprint = str(data['fingerprint']) if 'fingerprint' in data.files else ''
+
+        unchanged = stat.st_size == index.csv_size and stat.st_mtime_ns == index.csv_mtime_ns
+        if unchanged and index.columns:
+            return index
+        index = index._catch_up()
+        index.save()
+        return index
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def _fingerprint(self) -> str:
+        """Hash of the header and the last indexed row, as they are in the CSV now"""
+        digest = hashlib.sha1()
+        header_end = self.offsets[0] if len(self.offsets) else self.csv_size
+        with open(self.csv_path, 'rb') as f:
+            digest.update(f.read(header_end))
+            if len(self.offsets):
+                f.seek(self.offsets[-1])
+                digest.update(f.read(self.csv_size - self.offsets[-1]))
+        return digest.hexdigest()
+
+    def _catch_up(self) -> 'ActivityIndex':
+        """Index rows appended since `csv_size`, or a fresh index if the indexed bytes changed
+
+        A CSV rewritten in place can end up larger; the fingerprint check
+        keeps that from being mistaken for an append.
+        """
+        if (not self.columns or os.path.getsize(self.csv_path) <= self.csv_size
+                or self._fingerprint() != self.fingerprint):
+            logger.info(f"Rebuilding activity index for {self.csv_path}")
+            index = type(self)(self.csv_path)
+        else:
+            index = self
+        index._index_tail()
+        return index
+
+    def _index_tail(self):
+        """Index the records written after `csv_size`, the header first when starting from 0"""
+        new_offsets, new_ids, new_athletes = [], [], []
+        for offset, record in _scan_records(self.csv_path, self.csv_size):
+            fields = next(csv.reader(io.StringIO(record.decode('utf-8'))), None)
+            if not fields:
+                continue
+            if not self.columns:
+                self.columns = fields
+                continue
+            row = dict(zip(self.columns, fields))
+            new_offsets.append(offset)
+            new_ids.append(int(float(row.get('Activity ID') or 0)))
+            new_athletes.append(int(float(row.get('Athlete ID') or 0)))
+            serial = row.get(self.columns[0]) or 0
+            self.last_serial = max(self.last_serial, int(float(serial)))
+        self._add_rows(new_offsets, new_ids, new_athletes)
+        stat = os.stat(self.csv_path)
+        self.csv_size, self.csv_mtime_ns = stat.st_size, stat.st_mtime_ns
+        self.fingerprint = self._fingerprint()
+        if new_offsets:
+            logger.info(f"Indexed {len(new_offsets)} activity rows ({len(self)} total)")
+
+    def _add_rows(self, offsets: list, ids: list, athlete_ids: list):
+        if not offsets:
+            return
+        rows = np.arange(len(self.offsets), len(self.offsets) + len(offsets), dtype='int64')
+        self.offsets = np.concatenate([self.offsets, np.asarray(offsets, dtype='int64')])
+        ids = np.asarray(ids, dtype='int64')
+        order = np.argsort(ids, kind='stable')
+        positions = np.searchsorted(self.ids, ids[order], side='right')
+        self.ids = np.insert(self.ids, positions, ids[order])
+        self.id_rows = np.insert(self.id_rows, positions, rows[order])
+        self.athlete_ids = np.union1d(self.athlete_ids, np.asarray(athlete_ids, dtype='int64'))
+
+    def contains(self, activity_ids) -> np.ndarray:
+        """Boolean mask of which `activity_ids` are already in the CSV"""
+        activity_ids = np.asarray(activity_ids, dtype='int64')
+        if not len(self.ids):
+            return np.zeros(len(activity_ids), dtype=bool)
+        positions = np.searchsorted(self.ids, activity_ids).clip(max=len(self.ids) - 1)
+        return self.ids[positions] == activity_ids
+
+    def read_rows(self, activity_ids) -> pd.DataFrame:
+        """Read only the CSV rows for `activity_ids`, seeking to their offsets"""
+        activity_ids = np.asarray(activity_ids, dtype='int64')
+        positions = np.searchsorted(self.ids, activity_ids)
+        found = self.contains(activity_ids)
+        rows = np.sort(self.id_rows[positions[found]])
+        ends = np.append(self.offsets[1:], self.csv_size)
+        chunks = []
+        with open(self.csv_path, 'rb') as f:
+            for row in rows:
+                f.seek(self.offsets[row])
+                chunks.append(f.read(ends[row] - self.offsets[row]))
+        if not chunks:
+            return pd.DataFrame(columns=self.columns)
+        return pd.read_csv(io.BytesIO(b''.join(chunks)), names=self.columns, header=None)
+
+    def append(self, activities: pd.DataFrame) -> pd.DataFrame:
+        """Append rows whose Activity ID is not in the CSV yet; returns the rows written
+
+        Rows are written in the CSV's column order, and the sidecar is
+        updated by indexing only the appended bytes.
+        """
+        if os.path.getsize(self.csv_path) != self.csv_size:
+            caught_up = self._catch_up()
+            self.__dict__.update(caught_up.__dict__)
+        activities = activities[~self.contains(activities['Activity ID'])]
+        activities = activities.drop_duplicates(subset='Activity ID', keep='last')
+        if activities.empty:
+            return activities
+        with open(self.csv_path, 'a') as f:
+            activities[self.columns].to_csv(f, header=False, index=False)
+        self._index_tail()
+        self.save()
+        return activities
+
+    def save(self):
+        """Write the sidecar atomically, so a crash never leaves a torn index"""
+        tmp_path = self.sidecar_path + '.tmp.npz'
+        np.savez(
+            tmp_path, ids=self.ids, id_rows=self.id_rows, offsets=self.offsets, athlete_ids=self.athlete_ids,
+            last_serial=self.last_serial, csv_size=self.csv_size, csv_mtime_ns=self.csv_mtime_ns,
+            columns=np.asarray(self.columns, dtype=str), fingerprint=self.fingerprint,
+        )
+        os.replace(tmp_path, self.sidecar_path)
@@ -0,0 +1,228 @@
+"""Columnar Parquet store for the activities database and raw batch data
+
+The pipeline steps used to re-parse whole CSVs with pd.read_csv to look at
+one or two columns. Here the same data is kept as Parquet with explicit
+dtypes, and `read_activities` reads only the requested columns and the
+partitions matching the athlete/week predicates:
+
+    ../data/columnar/activities/athlete_id=<id>/iso_year=<year>/part-*.parquet
+    ../data/columnar/raw_activities/athlete_id=<id>/iso_year=<year>/part-*.parquet
+
+Activities are partitioned by athlete and ISO year, with an `iso_week`
+column ('2024-W03') sorted within each file. Partitioning all the way down
+to the week would leave ~6 rows per file, so week predicates prune on the
+year directory and then filter on iso_week inside the remaining files.
+
+The CSVs stay the source of truth (update_activities_database appends to
+both). Each dataset records the size and mtime of the CSVs it mirrors in
+../data/columnar/<dataset>.source.json. When pyarrow is not installed, the
+store has not been built, or a CSV changed without the store following
+(a failed Parquet write, rows appended by another tool), the readers fall
+back to the CSVs (still reading only the requested columns), so no step
+reads stale data. `convert` brings the store back in sync.
+
+Build or rebuild the store from the CSVs (from Get_Data/):
+    python columnar_store.py convert
+"""
+import argparse
+import glob
+import json
+import logging
+import os
+import shutil
+import uuid
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+except ImportError:  # pyarrow is optional; readers fall back to the CSVs
+    pa = ds = None
+
+logger = logging.getLogger(__name__)
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STORE_DIR = os.path.join(ROOT_DIR, 'data', 'columnar')
+ACTIVITIES_CSV = os.path.join(ROOT_DIR, 'indiv_activities_full.csv')
+RAW_BATCH_GLOB = os.path.join(ROOT_DIR, 'data', 'raw_data', 'batch_*_indiv_activities.csv')
+
+# Column dtypes per dataset, in CSV column order. Start Date stays the raw
+# string so rows round-trip to indiv_activities_full.csv unchanged.
+DTYPES = {
+    'activities': {
+        'Serial': 'int64', 'Athlete ID': 'int64', 'Athlete Name': 'string', 'Activity ID': 'int64',
+        'Activity Name': 'string', 'Description': 'string', 'Start Date': 'string',
+        'Elapsed Time': 'int64', 'Type': 'string', 'Location': 'string',
+        'Pace (min/mi)': 'float64', 'Pace (min/km)': 'float64', 'Time (min)': 'float64',
+        'Distance (km)': 'float64', 'Activity Time (s)': 'float64', 'Time': 'string',
+    },
+    'raw_activities': {
+        'batch': 'int64', 'Athlete ID': 'int64', 'Athlete Name': 'string', 'Activity ID': 'int64',
+        'Activity Name': 'string', 'Description': 'string', 'Start Date': 'string',
+        'Elapsed Time': 'int64', 'Type': 'string', 'Location': 'string',
+        'Distance (mi)': 'float64', 'Pace (min/mi)': 'float64', 'Time': 'string',
+    },
+}
+CSV_SOURCES = {'activities': ACTIVITIES_CSV, 'raw_activities': RAW_BATCH_GLOB}
+
+
+def _source_state(dataset: str) -> dict:
+    """{path: [size, mtime_ns]} of the CSVs `dataset` is built from"""
+    state = {}
+    for path in sorted(glob.glob(CSV_SOURCES[dataset])):
+        stat = os.stat(path)
+        state[os.path.relpath(path, ROOT_DIR)] = [stat.st_size, stat.st_mtime_ns]
+    return state
+
+
+def _source_path(dataset: str) -> str:
+    return os.path.join(STORE_DIR, f'{dataset}.source.json')
+
+
+def record_source(dataset: str = 'activities'):
+    """Mark `dataset` as in sync with its CSVs as they are now"""
+    tmp_path = _source_path(dataset) + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(_source_state(dataset), f)
+    os.replace(tmp_path, _source_path(dataset))
+
+
+def available(dataset: str = 'activities') -> bool:
+    """True when pyarrow is installed and `dataset` is converted and in sync with its CSVs"""
+    if pa is None or not os.path.isdir(os.path.join(STORE_DIR, dataset)):
+        return False
+    try:
+        with open(_source_path(dataset)) as f:
+            recorded = json.load(f)
+    except (OSError, ValueError):
+        recorded = None
+    if recorded != _source_state(dataset):
+        logger.warning(f"Columnar {dataset} store is out of date with its CSVs; reading the CSVs "
+                       f"(run `python columnar_store.py convert` to rebuild)")
+        return False
+    return True
+
+
+def _partition_schema():
+    return pa.schema([pa.field('athlete_id', pa.int64()), pa.field('iso_year', pa.int32())])
+
+
+def _arrow_schema(dataset: str):
+    """DTYPES as an Arrow schema, plus iso_week and the partition columns"""
+    types = {'int64': pa.int64(), 'float64': pa.float64(), 'string': pa.string()}
+    fields = [pa.field(name, types[dtype]) for name, dtype in DTYPES[dataset].items()]
+    fields.append(pa.field('iso_week', pa.string()))
+    return pa.schema(fields + list(_partition_schema()))
+
+
+def _coerce(df: pd.DataFrame, dataset: str) -> pd.DataFrame:
+    """Cast columns to DTYPES (missing columns become null) and add the partition columns"""
+    df = df.loc[:, [c for c in df.columns if not str(c).startswith('Unnamed')]].copy()
+    for name, dtype in DTYPES[dataset].items():
+        if name not in df.columns:
+            df[name] = pd.NA
+        if dtype == 'int64':
+            df[name] = pd.to_numeric(df[name], errors='coerce').round().astype('Int64')
+        elif dtype == 'float64':
+            df[name] = pd.to_numeric(df[name], errors='coerce').astype('float64')
+        else:
+            df[name] = df[name].astype('string')
+    dates = pd.to_datetime(df['Start Date'], utc=True, format='mixed', errors='coerce')
+    iso = dates.dt.isocalendar()
+    # Undated rows land in iso_year=0 rather than a null partition
+    df['iso_year'] = iso['year'].fillna(0).astype('int32')
+    df['iso_week'] = (iso['year'].astype('string') + '-W' + iso['week'].astype('string').str.zfill(2)).fillna('')
+    df['athlete_id'] = df['Athlete ID'].fillna(0).astype('int64')
+    return df.sort_values(['athlete_id', 'iso_week'])
+
+
+def write_activities(df: pd.DataFrame, dataset: str = 'activities'):
+    """Append rows to a partitioned dataset; new files never replace existing ones"""
+    if pa is None:
+        raise ImportError("pyarrow is required to write the columnar store (pip install pyarrow)")
+    df = _coerce(df, dataset)
+    table = pa.Table.from_pandas(df, schema=_arrow_schema(dataset), preserve_index=False)
+    ds.write_dataset(
+        table, os.path.join(STORE_DIR, dataset), format='parquet',
+        partitioning=ds.partitioning(_partition_schema(), flavor='hive'),
+        basename_template=f'part-{uuid.uuid4().hex}-{{i}}.parquet',
+        existing_data_behavior='overwrite_or_ignore',
+    )
+    logger.info(f"Wrote {len(df)} rows to {dataset} columnar store")
+
+
+def _csv_frame(dataset: str, columns) -> pd.DataFrame:
+    """CSV fallback: the same columns and dtypes as the Parquet reader"""
+    usecols = None
+    if columns is not None:
+        usecols = lambda c: c in set(columns) | {'Athlete ID', 'Start Date'}
+    paths = sorted(glob.glob(CSV_SOURCES[dataset]))
+    frames = []
+    for path in paths:
+        frame = pd.read_csv(path, usecols=usecols)
+        if dataset == 'raw_activities':
+            frame['batch'] = int(os.path.basename(path).split('_')[1])
+        frames.append(frame)
+    return _coerce(pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(), dataset)
+
+
+def read_activities(columns: list = None, athlete_ids: list = None, weeks: tuple = None,
+                    where=None, dataset: str = 'activities') -> pd.DataFrame:
+    """Read activities, loading only `columns` and the matching partitions
+
+    Args:
+        columns: Columns to return (default: all)
+        athlete_ids: Only these athletes; prunes athlete_id partitions
+        weeks: Inclusive (first, last) ISO weeks such as ('2024-W45', '2024-W47');
+            prunes iso_year partitions, then filters on iso_week
+        where: Extra pyarrow.dataset expression, e.g. ds.field('Type') == 'Run'
+            (ignored by the CSV fallback)
+        dataset: 'activities' or 'raw_activities'
+
+    Returns:
+        DataFrame with DTYPES dtypes
+    """
+    if not available(dataset):
+        df = _csv_frame(dataset, columns)
+        if athlete_ids is not None:
+            df = df[df['athlete_id'].isin(list(athlete_ids))]
+        if weeks is not None:
+            df = df[(df['iso_week'] >= weeks[0]) & (df['iso_week'] <= weeks[1])]
+        return df[columns].reset_index(drop=True) if columns is not None else df.reset_index(drop=True)
+
+    predicates = []
+    if athlete_ids is not None:
+        predicates.append(ds.field('athlete_id').isin([int(i) for i in athlete_ids]))
+    if weeks is not None:
+        first, last = weeks
+        predicates.append((ds.field('iso_year') >= int(first[:4])) & (ds.field('iso_year') <= int(last[:4])))
+        predicates.append((ds.field('iso_week') >= first) & (ds.field('iso_week') <= last))
+    if where is not None:
+        predicates.append(where)
+    expression = None
+    for predicate in predicates:
+        expression = predicate if expression is None else expression & predicate
+
+    dataset_ = ds.dataset(os.path.join(STORE_DIR, dataset), format='parquet',
+                          partitioning=ds.partitioning(_partition_schema(), flavor='hive'))
+    return dataset_.to_table(columns=columns, filter=expression).to_pandas()
+
+
+def convert():
+    """Rebuild the whole store from the CSVs"""
+    if pa is None:
+        raise ImportError("pyarrow is required to build the columnar store (pip install pyarrow)")
+    for dataset in ('activities', 'raw_activities'):
+        shutil.rmtree(os.path.join(STORE_DIR, dataset), ignore_errors=True)
+        if glob.glob(CSV_SOURCES[dataset]):
+            write_activities(_csv_frame(dataset, None).drop(columns=['athlete_id', 'iso_year', 'iso_week']), dataset)
+            record_source(dataset)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Columnar Parquet store for the pipeline CSVs")
+    parser.add_argument('command', choices=['convert'], help='convert: rebuild the store from the CSVs')
+    parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    convert()
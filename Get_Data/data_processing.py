@@ -3,6 +3,9 @@ import numpy as np
 from datetime import datetime
 import os
 import logging
+import columnar_store
+from activity_index import ActivityIndex
+from durations import parse_durations
 from test_scraping import check_data_updates
 
 # Setup logging
@@ -13,32 +16,8 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def time_to_minutes(time_str):
-    """Convert time string to minutes"""
-    try:
-        hours, minutes, seconds = 0, 0, 0
-        
-        # Parse "1h 14m" format
-        if "h" in time_str:
-            parts = time_str.split("h")
-            hours = int(parts[0].strip())
-            time_str = parts[1].strip()
-        
-        # Parse "50m 1s" or "0m XXs"
-        if "m" in time_str:
-            parts = time_str.split("m")
-            minutes = int(parts[0].strip())
-            if "s" in parts[1]:
-                seconds = int(parts[1].replace("s", "").strip())
-        elif "s" in time_str:
-            # Handle "0m XXs" or "XXs"
-            seconds = int(time_str.replace("s", "").strip())
-
-        # Convert to decimal minutes
-        return round(hours * 60 + minutes + seconds / 60, 2)
-    except:
-        return 0  # Default for invalid entries
-
+# Left NaN when the Strava duration could not be parsed, rather than zeroed
+DURATION_COLUMNS = ['Pace (min/km)', 'Time (min)', 'Activity Time (s)']
 
 def clean_activities_data(raw_activities: pd.DataFrame) -> pd.DataFrame:
     """Clean and convert activity data types"""
@@ -48,10 +27,10 @@ def clean_activities_data(raw_activities: pd.DataFrame) -> pd.DataFrame:
     logger.info(f"Athlete IDs being processed: {sorted(target_ids)}")
     # Read existing database to get last serial number and validate structure
     try:
-        existing_df = pd.read_csv("../indiv_activities_full.csv")
-        last_serial = existing_df.iloc[-1, 0] if not existing_df.empty else 0
-        expected_columns = existing_df.columns
-        existing_ids = existing_df['Athlete ID'].unique()
+        index = ActivityIndex.load()
+        last_serial = index.last_serial
+        expected_columns = pd.Index(index.columns)
+        existing_ids = index.athlete_ids
         new_ids = set(target_ids) - set(existing_ids)
         if new_ids:
             logger.warning(f"New athlete IDs not in existing database: {sorted(new_ids)}")
@@ -69,7 +48,10 @@ def clean_activities_data(raw_activities: pd.DataFrame) -> pd.DataFrame:
     # Convert Time to minutes if needed
     if 'Time (min)' not in clean_df.columns and 'Time' in clean_df.columns:
         logger.info("Converting Time to minutes...")
-        clean_df['Time (min)'] = clean_df['Time'].apply(time_to_minutes)
+        clean_df['Time (min)'], unparsed = parse_durations(clean_df['Time'])
+        if unparsed.any():
+            logger.warning(f"{unparsed.sum()} activities have an unparseable Time, e.g. "
+                           f"{clean_df.loc[unparsed, 'Time'].dropna().unique()[:5].tolist()}")
         # Calculate Activity Time (seconds)
         clean_df['Activity Time (s)'] = clean_df['Time (min)'] * 60
     
@@ -102,7 +84,9 @@ def clean_activities_data(raw_activities: pd.DataFrame) -> pd.DataFrame:
                     'Distance (km)', 'Activity Time (s)']
     for col in float_columns:
         if col in clean_df.columns:
-            clean_df[col] = pd.to_numeric(clean_df[col], errors='coerce').fillna(0).astype('float64')
+            clean_df[col] = pd.to_numeric(clean_df[col], errors='coerce').astype('float64')
+            if col not in DURATION_COLUMNS:
+                clean_df[col] = clean_df[col].fillna(0)
     
     # Reorder columns to match existing database
     required_columns = [
@@ -147,7 +131,9 @@ def clean_activities_data(raw_activities: pd.DataFrame) -> pd.DataFrame:
     # Float columns
     float_columns = ['Pace (min/mi)', 'Pace (min/km)', 'Time (min)', 'Distance (km)', 'Activity Time (s)']
     for col in float_columns:
-        clean_df[col] = pd.to_numeric(clean_df[col], errors='coerce').fillna(0).astype('float64')
+        clean_df[col] = pd.to_numeric(clean_df[col], errors='coerce').astype('float64')
+        if col not in DURATION_COLUMNS:
+            clean_df[col] = clean_df[col].fillna(0)
     
     # Reorder columns to match required structure
     clean_df = clean_df[required_columns]
@@ -167,28 +153,30 @@ def clean_activities_data(raw_activities: pd.DataFrame) -> pd.DataFrame:
 def update_activities_database(new_activities: pd.DataFrame) -> bool:
     """Update indiv_activities_full.csv with new cleaned activities"""
     try:
-        # Read existing database
-        existing_activities = pd.read_csv("../indiv_activities_full.csv")
-        logger.info(f"Existing activities: {len(existing_activities)}")
-        
-        # Filter out activities that already exist
-        new_unique_activities = new_activities[
-            ~new_activities['Activity ID'].isin(existing_activities['Activity ID'])
-        ]
+        # Dedupe against the sidecar index and append only the new rows
+        index = ActivityIndex.load()
+        logger.info(f"Existing activities: {len(index)}")
+        # Checked before the CSV changes: only a store that was in sync may be marked in sync again
+        store_in_sync = columnar_store.available()
+        new_unique_activities = index.append(new_activities)
         
         if new_unique_activities.empty:
             logger.info("No new unique activities to add")
             return True
             
-        # Log new activities being added
-        logger.info("\nNew activities to be appended:")
+        # Log new activities appended
+        logger.info("\nNew activities appended:")
         for athlete in new_unique_activities['Athlete Name'].unique():
             athlete_activities = new_unique_activities[new_unique_activities['Athlete Name'] == athlete]
             logger.info(f"{athlete}: {len(athlete_activities)} activities")
         
-        # Append to database
-        with open("../indiv_activities_full.csv", 'a') as f:
-            new_unique_activities.to_csv(f, header=False, index=False)
+        if store_in_sync:
+            try:
+                columnar_store.write_activities(new_unique_activities)
+                columnar_store.record_source()
+            except Exception as e:
+                # The CSV has the rows; readers fall back to it until the store is rebuilt
+                logger.error(f"Columnar store not updated ({str(e)}); run columnar_store.py convert")
         
         logger.info(f"Successfully added {len(new_unique_activities)} new activities")
         return True
@@ -200,21 +188,25 @@ def update_activities_database(new_activities: pd.DataFrame) -> bool:
 def calculate_athlete_metrics(target_ids: list, end_week: int) -> pd.DataFrame:
     """Calculate metrics from indiv_activities_full for target athletes"""
     try:
-        # Read complete activities database
-        activities_df = pd.read_csv("../indiv_activities_full.csv")
-        
         logger.info(f"Calculating metrics for athlete IDs: {sorted(target_ids)}")
         
-        # Filter activities for target athletes
-        activities_df = activities_df[activities_df['Athlete ID'].isin(target_ids)]
+        # Read only the target athletes' partitions and the columns aggregated below
+        activities_df = columnar_store.read_activities(
+            columns=['Athlete ID', 'Type', 'Distance (km)', 'Time (min)'],
+            athlete_ids=target_ids
+        )
         
         if activities_df.empty:
             logger.error("No activities found for target IDs")
             return pd.DataFrame()
         
+        # Pace only counts the distance of activities whose Time could be parsed
+        activities_df['Timed Distance (km)'] = activities_df['Distance (km)'].where(activities_df['Time (min)'].notna())
+        
         # Group by athlete and activity type
         grouped = activities_df.groupby(['Athlete ID', 'Type']).agg({
             'Distance (km)': 'sum',
+            'Timed Distance (km)': 'sum',
             'Time (min)': 'sum'
         }).reset_index()
         
@@ -222,6 +214,9 @@ def calculate_athlete_metrics(target_ids: list, end_week: int) -> pd.DataFrame:
         pivot_dist = grouped.pivot(index='Athlete ID', 
                                  columns='Type', 
                                  values='Distance (km)').fillna(0).reset_index()
+        pivot_timed_dist = grouped.pivot(index='Athlete ID', 
+                                 columns='Type', 
+                                 values='Timed Distance (km)').fillna(0).reset_index()
         pivot_time = grouped.pivot(index='Athlete ID', 
                                  columns='Type', 
                                  values='Time (min)').fillna(0).reset_index()
@@ -233,7 +228,7 @@ def calculate_athlete_metrics(target_ids: list, end_week: int) -> pd.DataFrame:
             'Avg_Weekly_Run_Mileage_km': pivot_dist.get('Run', 0) / end_week, #this needs to be dynamically handled
             'Total_Run_Hours': pivot_time.get('Run', 0) / 60,
             'Avg_Weekly_Run_Hours': (pivot_time.get('Run', 0) / 60) / end_week, #this needs to be dynamically handled 
-            'Avg_Run_Pace_min_per_km': pivot_time.get('Run', 0) / pivot_dist.get('Run', 0),
+            'Avg_Run_Pace_min_per_km': pivot_time.get('Run', 0) / pivot_timed_dist.get('Run', 0),
             'Total_Ride_Hours': pivot_time.get('Ride', 0) / 60,
             'Total_Swim_Hours': pivot_time.get('Swim', 0) / 60,
             'Total_Other_Hours': pivot_time.get('Other', 0) / 60
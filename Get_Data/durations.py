@@ -0,0 +1,46 @@
+"""Strava duration parsing ("1h 14m", "50m 1s", "45s") for whole columns
+
+parse_durations handles the activity `Time` column, the weekly `Time` in
+df_weekly and `Elapsed Time` (integer seconds) with one compiled regex.
+Activity and weekly durations repeat heavily (~113k raw activity rows
+have a few thousand distinct values), so the regex runs once per distinct
+value and the results are broadcast back with the factorized codes.
+
+Values the pattern rejects (cadence, calories, swim paces, "7 m" of
+elevation and other stats Strava shows in the same slot) come back as NaN
+and are flagged in the returned mask instead of being silently zeroed.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+DURATION_PATTERN = re.compile(r'^\s*(?:(?P<h>\d+)h)?\s*(?:(?P<m>\d+)m)?\s*(?:(?P<s>\d+)s)?\s*$')
+
+
+def parse_durations(values) -> tuple:
+    """Parse durations to float minutes, rounded to 2 decimals
+
+    Args:
+        values: Series (or list) of duration strings, or of seconds when numeric
+
+    Returns:
+        (minutes, unparsed): float Series with NaN for unparseable rows, and a
+        bool Series marking those rows (missing values included)
+    """
+    values = pd.Series(values)
+    if pd.api.types.is_numeric_dtype(values):
+        minutes = (values.astype('float64') / 60).round(2)
+        return minutes, minutes.isna()
+
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    parts = pd.Series(uniques, dtype='string').str.extract(DURATION_PATTERN).astype('float64')
+    # Every component is optional, so an empty match means nothing was parsed
+    unique_minutes = (parts['h'].fillna(0) * 60 + parts['m'].fillna(0) + parts['s'].fillna(0) / 60)
+    unique_minutes = unique_minutes.where(parts.notna().any(axis=1)).round(2).to_numpy()
+
+    minutes = np.full(len(values), np.nan)
+    present = codes >= 0
+    minutes[present] = unique_minutes[codes[present]]
+    minutes = pd.Series(minutes, index=values.index)
+    return minutes, minutes.isna()
@@ -1,6 +1,7 @@
 import pandas as pd
 import shutil
 import logging
+from activity_index import ActivityIndex
 from strava_scrape_new import consolidate_weekly_data, web_driver, login_strava, setup_logging, process_activities, login_strava_manual
 import json
 import os 
@@ -62,7 +63,7 @@ def check_data_updates(start_week: int = 45, end_week: int = 47, specific_ids: l
             
         # Load existing databases
         master_df = pd.read_csv('../data/metadata/master_iaaf_database_with_strava.csv')
-        activities_df = pd.read_csv('../indiv_activities_full.csv')
+        activity_index = ActivityIndex.load()
         
         # Get new data
         test_df = master_df[master_df['Athlete ID'].isin(specific_ids)].copy()
@@ -122,7 +123,7 @@ def check_data_updates(start_week: int = 45, end_week: int = 47, specific_ids: l
                 logger.info(f"Saved processed activities to {processed_filepath}")
                 
                 # Get new activities
-                new_activities = new_activities_df[~new_activities_df['Activity ID'].isin(activities_df['Activity ID'])]
+                new_activities = new_activities_df[~activity_index.contains(new_activities_df['Activity ID'])]
                 logger.info(f"Found {len(new_activities)} new activities")
                 
                 # Update master database weeks scraped
@@ -0,0 +1,139 @@
+"""Cold start: how long a fresh interpreter takes to import main.py
+
+Each run starts a new `python -X importtime -c "import main"` process, the
+same work a serverless instance does before it can answer its first
+request. Reports the median wall time and main's cumulative import time,
+the slowest modules by cumulative and self time, and which heavy packages
+were pulled in. The raw -X importtime report of the median run and a JSON
+summary are saved, so runs can be compared before and after a change.
+
+Exits non-zero if a package listed in --forbid is imported (pandas and
+numpy by default; no route needs them).
+
+Usage (from the repo root):
+    python benchmarks/bench_coldstart.py [--runs 5] [--top 15] [--forbid pandas,numpy]
+        [--output coldstart.json] [--compare baseline.json]
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT_DIR, 'benchmarks', 'results')
+
+
+def import_main() -> tuple:
+    """Import main in a fresh interpreter; return (wall seconds, importtime report)"""
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import main'],
+                            cwd=ROOT_DIR, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"import main failed:\n{result.stderr[-2000:]}")
+    report = '\n'.join(line for line in result.stderr.splitlines() if line.startswith('import time:'))
+    return elapsed, report
+
+
+def parse_importtime(report: str) -> list:
+    """Rows of (module, self_us, cumulative_us) from -X importtime output"""
+    rows = []
+    for line in report.splitlines()[1:]:  # First line is the column header
+        self_us, cumulative_us, module = line.removeprefix('import time:').split('|')
+        rows.append((module.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def summarize(wall_seconds: list, rows: list, top: int, forbid: list) -> dict:
+    cumulative = {module: cum for module, _, cum in rows}
+    packages = {module.split('.')[0] for module, _, _ in rows}
+    return {
+        'wall_ms_median': statistics.median(wall_seconds) * 1000,
+        'wall_ms_min': min(wall_seconds) * 1000,
+        'import_main_ms': cumulative.get('main', 0) / 1000,
+        'modules_imported': len(rows),
+        'top_cumulative_ms': {m: cum / 1000 for m, _, cum in sorted(rows, key=lambda r: -r[2])[:top]},
+        'top_self_ms': {m: own / 1000 for m, own, _ in sorted(rows, key=lambda r: -r[1])[:top]},
+        'forbidden_imported': sorted(p for p in forbid if p in packages),
+    }
+
+
+def print_summary(summary: dict):
+    print(f"\n  wall time (median)   {summary['wall_ms_median']:8.1f} ms")
+    print(f"  wall time (min)      {summary['wall_ms_min']:8.1f} ms")
+    print(f"  import main          {summary['import_main_ms']:8.1f} ms  ({summary['modules_imported']} modules)")
+    print("\n  slowest by cumulative time:")
+    for module, ms in summary['top_cumulative_ms'].items():
+        print(f"    {ms:8.1f} ms  {module}")
+    print("\n  slowest by self time:")
+    for module, ms in summary['top_self_ms'].items():
+        print(f"    {ms:8.1f} ms  {module}")
+
+
+def print_comparison(baseline: dict, summary: dict):
+    print(f"\nChange vs {baseline['meta']['git_revision']} ({baseline['meta']['timestamp']}):")
+    for key in ('wall_ms_median', 'import_main_ms', 'modules_imported'):
+        before = baseline['summary'][key]
+        if before:
+            print(f"  {key:<18} {before:8.1f} -> {summary[key]:8.1f}  ({(summary[key] - before) / before * 100:+.1f}%)")
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help='fresh interpreters to start (median is reported)')
+    parser.add_argument('--top', type=int, default=15, help='modules listed per ranking')
+    parser.add_argument('--forbid', default='pandas,numpy', help='comma-separated packages main must not import')
+    parser.add_argument('--output', default=None, help='results file (default: benchmarks/results/coldstart-<time>.json)')
+    parser.add_argument('--compare', default=None, help='earlier results file to compare against')
+    args = parser.parse_args()
+
+    runs = []
+    for i in range(args.runs):
+        runs.append(import_main())
+        print(f"run {i + 1}/{args.runs}: {runs[-1][0] * 1000:.1f} ms")
+    wall_seconds = [elapsed for elapsed, _ in runs]
+    # Keep the module breakdown of the median run rather than an outlier
+    _, report = sorted(runs)[len(runs) // 2]
+    forbid = [p for p in args.forbid.split(',') if p]
+    summary = summarize(wall_seconds, parse_importtime(report), args.top, forbid)
+    print_summary(summary)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"coldstart-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({
+            'meta': {
+                'timestamp': datetime.now().isoformat(timespec='seconds'),
+                'git_revision': git_revision(),
+                'python': platform.python_version(),
+                'args': vars(args),
+            },
+            'summary': summary,
+        }, f, indent=2)
+    with open(os.path.splitext(output)[0] + '.importtime.txt', 'w') as f:
+        f.write(report + '\n')
+    print(f"\nSaved results to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(json.load(f), summary)
+
+    if summary['forbidden_imported']:
+        sys.exit(f"main imports {', '.join(summary['forbidden_imported'])} at startup")
+
+
+if __name__ == '__main__':
+    main()
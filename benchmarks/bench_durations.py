@@ -0,0 +1,92 @@
+"""Micro-benchmark: row-wise time_to_minutes vs the vectorized parse_durations
+
+Times both parsers on the `Time` column of data/raw_data/batch_*_indiv_activities.csv
+and on the weekly `Time` column of the df_weekly files in data/tempdata,
+checks they agree wherever the old parser succeeded, and reports how many
+rows the old parser silently turned into 0.
+
+Usage (from the repo root):
+    python benchmarks/bench_durations.py [--repeat 5] [--batches 20]
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'Get_Data'))
+
+from durations import parse_durations
+
+
+def time_to_minutes(time_str):
+    """The row-wise parser data_processing used before parse_durations (0 for invalid entries)"""
+    try:
+        hours, minutes, seconds = 0, 0, 0
+
+        # Parse "1h 14m" format
+        if "h" in time_str:
+            parts = time_str.split("h")
+            hours = int(parts[0].strip())
+            time_str = parts[1].strip()
+
+        # Parse "50m 1s" or "0m XXs"
+        if "m" in time_str:
+            parts = time_str.split("m")
+            minutes = int(parts[0].strip())
+            if "s" in parts[1]:
+                seconds = int(parts[1].replace("s", "").strip())
+        elif "s" in time_str:
+            # Handle "0m XXs" or "XXs"
+            seconds = int(time_str.replace("s", "").strip())
+
+        # Convert to decimal minutes
+        return round(hours * 60 + minutes + seconds / 60, 2)
+    except:
+        return 0  # Default for invalid entries
+
+
+def load_column(pattern: str, batches: int = None) -> pd.Series:
+    paths = sorted(glob.glob(os.path.join(ROOT_DIR, pattern)))[:batches]
+    return pd.concat([pd.read_csv(path, usecols=['Time'])['Time'] for path in paths], ignore_index=True)
+
+
+def best_of(func, values, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(values)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5, help='timing runs per parser (best is reported)')
+    parser.add_argument('--batches', type=int, default=None, help='raw activity batch files to load (default: all)')
+    args = parser.parse_args()
+
+    columns = {
+        'activities Time': load_column('data/raw_data/batch_*_indiv_activities.csv', args.batches),
+        'weekly Time': load_column('data/tempdata/metadata_*.csv'),
+    }
+    for name, values in columns.items():
+        legacy = values.apply(time_to_minutes)
+        minutes, unparsed = parse_durations(values)
+        agree = np.allclose(minutes[~unparsed], legacy[~unparsed])
+        zeroed = int((legacy[unparsed] == 0).sum())
+
+        row_wise = best_of(lambda v: v.apply(time_to_minutes), values, args.repeat)
+        vectorized = best_of(parse_durations, values, args.repeat)
+        print(f"\n{name}: {len(values)} rows, {values.nunique()} distinct, "
+              f"{int(unparsed.sum())} unparseable ({zeroed} zeroed by time_to_minutes), agree={agree}")
+        print(f"  {'time_to_minutes (.apply)':<28} {row_wise * 1000:8.2f} ms")
+        print(f"  {'parse_durations':<28} {vectorized * 1000:8.2f} ms  {row_wise / vectorized:5.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+"""Load test: throughput and latency of the web routes against in-memory data
+
+Imports the FastHTML app from main.py, swaps its MongoDB connection for
+benchmarks.memory_db.MemoryDatabase (seeded from cleaned_athlete_metadata.csv
+and data/raw_data/batch_*_indiv_activities.csv) and drives concurrent
+requests through the ASGI interface with httpx, so no server, network or
+MongoDB is involved. For each route it reports p50/p95/p99 latency,
+requests per second and bytes per response (as sent, i.e. after
+compression), and writes the results to a JSON file.
+
+Pass --compare with an earlier results file to print the change per route.
+
+Usage (from the repo root):
+    python benchmarks/bench_routes.py [--requests 500] [--concurrency 20] [--batches 10]
+        [--routes home,athlete] [--output results.json] [--compare baseline.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from urllib.parse import quote
+
+import httpx
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from benchmarks.memory_db import MemoryDatabase
+from utils.cache import DataVersion
+
+RESULTS_DIR = os.path.join(ROOT_DIR, 'benchmarks', 'results')
+
+
+def route_paths(database: MemoryDatabase, athletes: int) -> dict:
+    """Request paths per benchmarked route
+
+    Athlete routes cycle through the `athletes` athletes with the most
+    activities, since those pages are the slowest to build.
+    """
+    counts = database.activity_counts()
+    names = [
+        athlete['Competitor'] for athlete in database.athlete_metadata
+        if athlete.get('Competitor') and counts.get(athlete['Competitor'].casefold())
+    ]
+    names.sort(key=lambda name: counts[name.casefold()], reverse=True)
+    names = names[:athletes]
+    return {
+        'home': ['/'],
+        'api_athletes': ['/api/athletes'],
+        'api_countries': ['/api/map/countries'],
+        'athlete': [f"/athlete/{quote(name)}" for name in names],
+        'athlete_all': [f"/athlete/{quote(name)}?view=all" for name in names],
+    }
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    # Nearest-rank percentile
+    index = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def run_route(client: httpx.AsyncClient, paths: list, requests: int, concurrency: int, warmup: int) -> dict:
+    for i in range(warmup):
+        await client.get(paths[i % len(paths)])
+
+    latencies, sizes, errors = [], [], 0
+    queue = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for i in queue:
+            start = time.perf_counter()
+            response = await client.get(paths[i % len(paths)])
+            latencies.append(time.perf_counter() - start)
+            sizes.append(response.num_bytes_downloaded)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        'requests': requests,
+        'errors': errors,
+        'concurrency': concurrency,
+        'requests_per_second': requests / elapsed,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'mean_bytes': sum(sizes) / len(sizes),
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def print_results(routes: dict):
+    print(f"\n  {'route':<14} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'KiB/resp':>9} {'errors':>7}")
+    for name, r in routes.items():
+        print(f"  {name:<14} {r['requests_per_second']:9.1f} {r['p50_ms']:9.2f} {r['p95_ms']:9.2f} "
+              f"{r['p99_ms']:9.2f} {r['mean_bytes'] / 1024:9.1f} {r['errors']:7d}")
+
+
+def print_comparison(baseline: dict, routes: dict):
+    print(f"\nChange vs {baseline['meta']['git_revision']} ({baseline['meta']['timestamp']}):")
+    for name, r in routes.items():
+        before = baseline['routes'].get(name)
+        if before is None:
+            continue
+        changes = [
+            f"{key} {(r[key] - before[key]) / before[key] * 100:+6.1f}%"
+            for key in ('requests_per_second', 'p50_ms', 'p99_ms', 'mean_bytes') if before[key]
+        ]
+        print(f"  {name:<14} " + "  ".join(changes))
+
+
+async def run(args) -> dict:
+    import main as app_module
+
+    database = MemoryDatabase.from_fixtures(args.batches)
+    app_module.db = database
+    app_module.data_version = DataVersion(database.get_latest_update_log, ttl=float('inf'))
+    paths = route_paths(database, args.athletes)
+    routes = args.routes.split(',') if args.routes else list(paths)
+
+    results = {}
+    transport = httpx.ASGITransport(app=app_module.app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+        for name in routes:
+            print(f"{name}: {args.requests} requests, concurrency {args.concurrency}")
+            results[name] = await run_route(client, paths[name], args.requests, args.concurrency, args.warmup)
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'git_revision': git_revision(),
+            'python': platform.python_version(),
+            'activities': database.update_log['activities_count'],
+            'athletes': len(database.athlete_metadata),
+            'args': vars(args),
+        },
+        'routes': results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=500, help='timed requests per route')
+    parser.add_argument('--concurrency', type=int, default=20, help='requests in flight at once')
+    parser.add_argument('--warmup', type=int, default=10, help='untimed requests per route first')
+    parser.add_argument('--batches', type=int, default=None, help='raw activity batch files to load (default: all)')
+    parser.add_argument('--athletes', type=int, default=20, help='athletes cycled through by the athlete routes')
+    parser.add_argument('--routes', default=None, help='comma-separated subset of home,api_athletes,api_countries,athlete,athlete_all')
+    parser.add_argument('--output', default=None, help='results file (default: benchmarks/results/routes-<time>.json)')
+    parser.add_argument('--compare', default=None, help='earlier results file to compare against')
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    print_results(report['routes'])
+
+    output = args.output or os.path.join(RESULTS_DIR, f"routes-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nSaved results to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(json.load(f), report['routes'])
+
+
+if __name__ == '__main__':
+    main()
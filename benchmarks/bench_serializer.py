@@ -0,0 +1,115 @@
+"""Micro-benchmark: mongo_to_json_serializable + MongoJSONEncoder vs dumps_json
+
+Builds documents shaped like the athlete_metadata and activities
+collections from the CSVs in the repo (ObjectId _id, datetime Start Date)
+and times each serializer on them, both with pandas NaNs left in place
+(as documents loaded straight from DataFrame.to_dict are stored) and with
+non-finite fields dropped. Without orjson, dumps_json converts in one
+non-recursive pass and leaves encoding to the C json encoder; it measured
+1.1-1.4x faster than the legacy path (e.g. activities: 56 ms vs 69 ms with
+NaN, 58 ms vs 65 ms NaN-free), while orjson is ~10x faster.
+
+Usage (from the repo root):
+    python benchmarks/bench_serializer.py [--repeat 20] [--batches 5]
+"""
+import argparse
+import glob
+import json
+import math
+import os
+import sys
+import time
+
+import pandas as pd
+from bson import ObjectId
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import utils.helpers as helpers
+from utils.helpers import MongoJSONEncoder, dumps_json, mongo_to_json_serializable
+
+
+def load_athlete_metadata() -> list:
+    df = pd.read_csv(os.path.join(ROOT_DIR, 'cleaned_athlete_metadata.csv'))
+    docs = df.to_dict(orient='records')
+    for doc in docs:
+        doc['_id'] = ObjectId()
+    return docs
+
+
+def load_activities(batches: int) -> list:
+    paths = sorted(glob.glob(os.path.join(ROOT_DIR, 'data', 'raw_data', 'batch_*_indiv_activities.csv')))
+    df = pd.concat([pd.read_csv(path) for path in paths[:batches]], ignore_index=True)
+    df = df.drop(columns=[c for c in df.columns if c.startswith('Unnamed')])
+    df['Start Date'] = pd.to_datetime(df['Start Date'], utc=True, errors='coerce')
+    docs = df.to_dict(orient='records')
+    for doc in docs:
+        doc['_id'] = ObjectId()
+        start = doc['Start Date']
+        doc['Start Date'] = start.to_pydatetime() if pd.notna(start) else None
+    return docs
+
+
+def drop_non_finite(docs) -> list:
+    return [
+        {k: v for k, v in doc.items() if not (isinstance(v, float) and not math.isfinite(v))}
+        for doc in docs
+    ]
+
+
+def legacy(docs) -> bytes:
+    return json.dumps(mongo_to_json_serializable(docs), cls=MongoJSONEncoder).encode()
+
+
+def dumps_stdlib(docs) -> bytes:
+    backend = helpers.orjson
+    helpers.orjson = None
+    try:
+        return dumps_json(docs)
+    finally:
+        helpers.orjson = backend
+
+
+def best_of(func, docs, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(docs)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=20, help='timing runs per serializer (best is reported)')
+    parser.add_argument('--batches', type=int, default=5, help='raw activity batch files to load')
+    args = parser.parse_args()
+
+    athlete_metadata = load_athlete_metadata()
+    activities = load_activities(args.batches)
+    datasets = {
+        'athlete_metadata (with NaN)': athlete_metadata,
+        'athlete_metadata (NaN-free)': drop_non_finite(athlete_metadata),
+        'activities (with NaN)': activities,
+        'activities (NaN-free)': drop_non_finite(activities),
+    }
+    serializers = {
+        'mongo_to_json_serializable + json.dumps': legacy,
+        'dumps_json (stdlib)': dumps_stdlib,
+    }
+    if helpers.orjson is not None:
+        serializers['dumps_json (orjson)'] = dumps_json
+
+    for name, docs in datasets.items():
+        print(f"\n{name}: {len(docs)} documents")
+        baseline = None
+        for label, func in serializers.items():
+            seconds = best_of(func, docs, args.repeat)
+            baseline = baseline or seconds
+            size = len(func(docs))
+            print(f"  {label:<42} {seconds * 1000:8.2f} ms  {baseline / seconds:5.1f}x  {size / 1024:8.1f} KiB")
+
+
+if __name__ == '__main__':
+    main()
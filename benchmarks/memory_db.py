@@ -0,0 +1,151 @@
+"""In-memory stand-in for AsyncDatabaseConnection, seeded from the repo's CSVs
+
+Implements the methods main.py calls on `db` with the same semantics as
+the MongoDB queries (case-insensitive name matching, newest-first order,
+(Start Date, Activity ID) keyset pages, projected activity fields), so
+route benchmarks measure the app rather than the network or Atlas.
+
+Documents go through mongodb_init.schemas.normalize_records, so they have
+the same types as documents written by db_upload.py / db_update.py.
+"""
+import glob
+import os
+import sys
+from datetime import datetime, timezone
+
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from mongodb_init.connection import ACTIVITY_PROJECTION, ROSTER_PROJECTION, apply_projection
+from mongodb_init.schemas import normalize_records
+from mongodb_init.summary import build_summaries, field_name, weekly_totals
+
+KM_PER_MILE = 1.609344
+
+
+def _sort_key(activity: dict) -> tuple:
+    # Mirrors ACTIVITY_SORT; documents without a Start Date sort last, as nulls do in MongoDB
+    start_date = activity.get('Start Date')
+    return (start_date is not None, start_date or datetime.min, activity.get('Activity ID') or 0)
+
+
+def load_athlete_metadata() -> list:
+    df = pd.read_csv(os.path.join(ROOT_DIR, 'cleaned_athlete_metadata.csv'))
+    return normalize_records(df, 'athlete_metadata')
+
+
+def load_activities(batches: int = None) -> list:
+    """Activities from data/raw_data/batch_*_indiv_activities.csv, in the stored schema
+
+    The raw batches are in miles; the km columns the app renders are derived
+    here the same way Get_Data/data_processing.py derives them.
+    """
+    paths = sorted(glob.glob(os.path.join(ROOT_DIR, 'data', 'raw_data', 'batch_*_indiv_activities.csv')))
+    df = pd.concat([pd.read_csv(path) for path in paths[:batches]], ignore_index=True)
+    df['Distance (km)'] = pd.to_numeric(df['Distance (mi)'], errors='coerce') * KM_PER_MILE
+    df['Pace (min/km)'] = pd.to_numeric(df['Pace (min/mi)'], errors='coerce') / KM_PER_MILE
+    df['Time (min)'] = df['Pace (min/km)'] * df['Distance (km)']
+    df['Activity Time (s)'] = df['Time (min)'] * 60
+    df['Athlete Name'] = df['Athlete Name'].str.strip().str.title()
+    return normalize_records(df.drop(columns=['Distance (mi)']), 'activities')
+
+
+class MemoryCursor:
+    """Async iterator with the close() coroutine of pymongo's AsyncCursor"""
+    def __init__(self, documents):
+        self._documents = iter(documents)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._documents)
+        except StopIteration:
+            raise StopAsyncIteration
+
+    async def close(self):
+        self._documents = iter(())
+
+
+class MemoryDatabase:
+    """Drop-in for AsyncDatabaseConnection backed by lists of documents"""
+    def __init__(self, athlete_metadata: list, activities: list):
+        self.athlete_metadata = athlete_metadata
+        self._athletes = {}
+        for athlete in athlete_metadata:
+            if athlete.get('Competitor'):
+                self._athletes.setdefault(athlete['Competitor'].casefold(), athlete)
+        self._activities = {}
+        for activity in activities:
+            self._activities.setdefault(activity['Athlete Name'].casefold(), []).append(activity)
+        for athlete_activities in self._activities.values():
+            athlete_activities.sort(key=_sort_key, reverse=True)
+        self._summaries = build_summaries(activities)
+        self.update_log = {
+            'timestamp': datetime.now(timezone.utc).replace(tzinfo=None),
+            'activities_count': len(activities),
+            'version': 'benchmark',
+        }
+
+    @classmethod
+    def from_fixtures(cls, batches: int = None):
+        return cls(load_athlete_metadata(), load_activities(batches))
+
+    def activity_counts(self) -> dict:
+        """Activities per athlete (casefolded name), for picking benchmark targets"""
+        return {name: len(activities) for name, activities in self._activities.items()}
+
+    async def ensure_indexes(self):
+        pass
+
+    async def warm_up(self):
+        pass
+
+    async def health(self) -> dict:
+        return {'ping_ms': 0.0, 'pool': {}}
+
+    async def get_athlete_metadata(self, athlete_name: str):
+        return self._athletes.get(athlete_name.strip().casefold())
+
+    async def get_athlete_activities(self, athlete_name: str):
+        return list(self._activities.get(athlete_name.strip().casefold(), []))
+
+    async def get_athlete_activities_page(self, athlete_name: str, limit: int = 50, before=None):
+        activities = self._activities.get(athlete_name.strip().casefold(), [])
+        if before is not None:
+            start_date, activity_id = before
+            before_key = _sort_key({'Start Date': start_date, 'Activity ID': activity_id})
+            activities = [a for a in activities if _sort_key(a) < before_key]
+        page = [apply_projection(a, ACTIVITY_PROJECTION) for a in activities[:limit + 1]]
+        return page[:limit], len(page) > limit
+
+    def iter_athlete_activities(self, athlete_name: str, batch_size: int = 200):
+        activities = self._activities.get(athlete_name.strip().casefold(), [])
+        return MemoryCursor(apply_projection(a, ACTIVITY_PROJECTION) for a in activities)
+
+    async def get_athlete_weekly_totals(self, athlete_id: int):
+        return weekly_totals(
+            a for activities in self._activities.values() for a in activities if a.get('Athlete ID') == athlete_id
+        )
+
+    async def get_athlete_summary(self, athlete_id: int):
+        return self._summaries.get(athlete_id)
+
+    async def get_summary_leaderboard(self, activity_type: str = 'Run', limit: int = 20):
+        # Summary keys go through field_name, as in the MongoDB and SQLite backends
+        key = field_name(activity_type)
+        ranked = [s for s in self._summaries.values() if s.get('types', {}).get(key, {}).get('count', 0) > 0]
+        ranked.sort(key=lambda s: s['types'][key].get('distance_km', 0), reverse=True)
+        return [
+            {'_id': s['_id'], 'Athlete Name': s.get('Athlete Name'), 'types': {activity_type: s['types'][key]}}
+            for s in ranked[:limit]
+        ]
+
+    async def get_roster(self):
+        return [apply_projection(a, ROSTER_PROJECTION) for a in self.athlete_metadata]
+
+    async def get_latest_update_log(self):
+        return self.update_log
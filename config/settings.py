@@ -4,4 +4,36 @@ from dotenv import load_dotenv
 load_dotenv()
 
 MONGO_URI = os.getenv("MONGO_URI")
-DEBUG = os.getenv("DEBUG", "False").lower() == "true"
\ No newline at end of file
+
+# Where the web app reads from: "mongo" (MONGO_URI) or "sqlite" (a local file built by
+# `python -m mongodb_init.sqlite_store`)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "mongo").lower()
+SQLITE_PATH = os.getenv("SQLITE_PATH", os.path.join("data", "elite_endurance.db"))
+DEBUG = os.getenv("DEBUG", "False").lower() == "true"
+
+# MongoDB client pool; MONGO_MIN_POOL_SIZE connections are opened at app start
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "100"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "2"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "10000"))
+MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "20000"))
+# Wire compression, in order of preference (zlib, zstd, snappy); empty disables it
+MONGO_COMPRESSORS = os.getenv("MONGO_COMPRESSORS", "zlib")
+
+# Seconds between checks of `update_logs` for a new data version
+DATA_VERSION_TTL = float(os.getenv("DATA_VERSION_TTL", "30"))
+
+# Activities rendered per page on /athlete/{name}; older pages load on demand
+ACTIVITIES_PAGE_SIZE = int(os.getenv("ACTIVITIES_PAGE_SIZE", "50"))
+
+# Activity rows fetched and flushed per chunk by the streaming /athlete/{name}?view=all page
+STREAM_CHUNK_ROWS = int(os.getenv("STREAM_CHUNK_ROWS", "200"))
+
+# Rendered athlete pages kept in memory per worker (least recently used are evicted)
+ATHLETE_PAGE_CACHE_SIZE = int(os.getenv("ATHLETE_PAGE_CACHE_SIZE", "256"))
+
+# Athlete names embedded per country in the map payload; full lists load with the popup
+MAP_ATHLETES_PER_COUNTRY = int(os.getenv("MAP_ATHLETES_PER_COUNTRY", "10"))
+
+# Requests slower than this are logged as warnings
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "500"))
@@ -1,20 +1,41 @@
-from fasthtml.common import *
-import json
-import pandas as pd
-from typing import Optional, Dict
+# Explicit imports rather than fasthtml.common: it pulls in fastlite/sqlite_minutils,
+# which import pandas and numpy, roughly doubling cold start
+from fasthtml.core import FastHTML, respond, serve
+from fasthtml.components import (
+    Article, Button, Div, H1, H2, H3, Header, Input, Li, Link, Main, P, Span, Table, Td, Th, Title, Tr, Ul
+)
+from fasthtml.xtend import A, Script, Style
+from fasthtml.pico import picolink
+from fastcore.xml import NotStr, to_xml
+from starlette.middleware import Middleware
+from starlette.requests import Request
+from starlette.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
+import asyncio
+from typing import TYPE_CHECKING, Optional, Dict
 from abc import ABC, abstractmethod
-from urllib.parse import unquote
-from mongodb_init.connection import DatabaseConnection
-from utils.helpers import mongo_to_json_serializable, MongoJSONEncoder
+from urllib.parse import quote, unquote, urlencode
+from mongodb_init.connection import get_async_database
+from mongodb_init.summary import summary_stats
+from utils.helpers import dumps_json, encode_roster
+from utils.cache import DataVersion, LRUCache, VersionedCache
+from utils.responses import PrecompressedBody
+from utils.search import AthleteSearchIndex
+from utils.metrics import MetricsMiddleware, metrics
+from config.settings import (
+    ACTIVITIES_PAGE_SIZE, ATHLETE_PAGE_CACHE_SIZE, DATA_VERSION_TTL, MAP_ATHLETES_PER_COUNTRY,
+    SLOW_REQUEST_MS, STREAM_CHUNK_ROWS
+)
 
 from datetime import datetime
 
-def parse_latest_log_stats():
+if TYPE_CHECKING:
+    # Only needed for annotations; importing pandas at runtime slows every cold start
+    import pandas as pd
+
+async def parse_latest_log_stats():
     try:
-        # Get the latest log entry from MongoDB
-        latest_log = db.db.update_logs.find_one(
-            sort=[('timestamp', -1)]  # Sort by timestamp descending
-        )
+        # Latest log entry from MongoDB, re-read at most every DATA_VERSION_TTL seconds
+        latest_log = await data_version.latest_log()
         
         if latest_log:
             return {
@@ -37,6 +58,8 @@ def format_date(date_str):
     """Format date string into readable format"""
     if not date_str:
         return "-"
+    if isinstance(date_str, datetime):
+        return date_str.strftime('%B %d, %Y at %I:%M %p')
     
     try:
         # Handle the specific format you're getting
@@ -62,7 +85,7 @@ def format_date(date_str):
 # Data Management
 class DataSource(ABC):
     @abstractmethod
-    def load_data(self) -> pd.DataFrame:
+    def load_data(self) -> 'pd.DataFrame':
         pass
 
 def _init_country_coordinates():
@@ -222,10 +245,29 @@ def _init_country_coordinates():
     }
 
 
+async def warm_up_db():
+    # Runs once per worker at startup: opens the min pool and creates indexes,
+    # without which lookups fall back to collection scans
+    try:
+        await db.warm_up()
+    except Exception as e:
+        print(f"Error warming up MongoDB: {e}")
+
+_warm_up_task = None
+
+async def start_db_warm_up():
+    # Not awaited, so a cold start doesn't hold the first request on connection setup
+    global _warm_up_task
+    _warm_up_task = asyncio.create_task(warm_up_db())
+
+
 # FastHTML App
-app, rt = fast_app(
-    use_sessions=False,
+app = FastHTML(
+    sess_cls=None,  # no sessions are used
+    on_startup=[start_db_warm_up],
+    middleware=[Middleware(MetricsMiddleware, slow_request_seconds=SLOW_REQUEST_MS / 1000)],
     hdrs=(
+        *picolink,  # added by fast_app by default
         Link(rel = 'stylesheet', href = 'https://cdn.jsdelivr.net/npm/@picocss/pico@1/css/pico.min.css'),
         Link(rel='stylesheet', href='https://unpkg.com/leaflet@1.7.1/dist/leaflet.css'),
         Link(rel='stylesheet', href='https://unpkg.com/leaflet.markercluster@1.4.1/dist/MarkerCluster.css'),
@@ -241,66 +283,143 @@ app, rt = fast_app(
         """),
     )
 )
+app.static_route_exts(static_path='.')
+rt = app.route
+
+# MongoDB, or a local SQLite file for development (STORAGE_BACKEND in config/settings.py)
+db = get_async_database()
+data_version = DataVersion(db.get_latest_update_log, ttl=DATA_VERSION_TTL)
+COUNTRY_COORDINATES = _init_country_coordinates()
+search_index = AthleteSearchIndex()
+
+
+async def build_homepage_payload(version: str) -> dict:
+    """Build everything the homepage needs from athlete_metadata
+
+    Runs once per data version; the result is shared by all requests.
+    """
+    # Documents are normalized at ingest (mongodb_init/schemas.py), so no per-request sanitizing
+    athletes_data = await db.get_roster()
+    # Only athletes added, removed or changed since the last version are reindexed
+    with metrics.span('sync_search_index'):
+        search_index.sync(athletes_data)
+    athletes_by_country = group_by_country(athletes_data)
+    with metrics.span('encode_roster'):
+        roster_body = PrecompressedBody(
+            dumps_json(encode_roster(athletes_data, COUNTRY_COORDINATES)), 'athletes'
+        )
+    with metrics.span('encode_countries'):
+        countries_body = PrecompressedBody(
+            dumps_json(encode_countries(athletes_by_country)), 'countries'
+        )
+    return {
+        'roster': roster_body,
+        'countries': countries_body,
+        'athletes_by_country': athletes_by_country,
+        'total_athletes': len(athletes_data),
+        'total_countries': len(set(athlete['Nat'] for athlete in athletes_data if athlete.get('Nat'))),
+        'log_stats': await parse_latest_log_stats(),
+    }
+
+def group_by_country(athletes: list) -> dict:
+    """Group roster entries by Nat, keeping only countries the map can place"""
+    by_country = {}
+    for athlete in athletes:
+        if athlete.get('Nat') in COUNTRY_COORDINATES:
+            by_country.setdefault(athlete['Nat'], []).append(athlete)
+    return by_country
+
+def encode_countries(athletes_by_country: dict) -> dict:
+    """One map point per country with its athlete count and a bounded name list
+
+    Sent as positional rows in the same compact style as encode_roster; the
+    browser expands them into the GeoJSON features Leaflet expects.
 
-db = DatabaseConnection.get_instance()
+    Returns:
+        Dict with `rows` of [Nat, lat, lng, athlete count, [Athlete Name, ...]]
+    """
+    rows = []
+    for nat, athletes in athletes_by_country.items():
+        coords = COUNTRY_COORDINATES[nat]
+        rows.append([
+            nat, coords['lat'], coords['lng'], len(athletes),
+            [a.get('Athlete Name') for a in athletes[:MAP_ATHLETES_PER_COUNTRY]],
+        ])
+    return {'rows': rows}
+
+def country_popup(nat: str, athletes: list):
+    return Div(
+        H3(nat, style="font-size: 12px; margin: 0 0 4px 0;"),
+        P(f"Athletes: {len(athletes)}", style="margin: 0 0 4px 0; font-size: 10px;"),
+        Ul(
+            *[Li(
+                A(
+                    a.get('Athlete Name'),
+                    href=f"/athlete/{quote(a.get('Competitor') or '')}",
+                    style="text-decoration: none; font-size: 10px;"
+                ),
+                " ",
+                Span(f"({a.get('Discipline')})", style="color: #666; font-size: 9px;"),
+                style="margin-bottom: 2px;"
+            ) for a in athletes],
+            style="margin: 0; padding-left: 12px; font-size: 10px;"
+        ),
+        style="max-height: 200px; overflow-y: auto; font-size: 11px;"
+    )
+
+homepage_cache = VersionedCache(build_homepage_payload)
+athlete_page_cache = LRUCache(maxsize=ATHLETE_PAGE_CACHE_SIZE)
+athlete_weekly_cache = LRUCache(maxsize=ATHLETE_PAGE_CACHE_SIZE)
 
 
-def create_map_script(athletes_data: list) -> str:
-    return f"""
+def create_map_script() -> str:
+    # Expects `countries` to hold the GeoJSON expanded from /api/map/countries
+    return """
         var map = L.map('map').setView([0, 0], 2);
-        L.tileLayer('https://{{s}}.tile.openstreetmap.org/{{z}}/{{x}}/{{y}}.png', {{
+        L.tileLayer('https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png', {
             attribution: '© OpenStreetMap contributors'
-        }}).addTo(map);
+        }).addTo(map);
 
-        var athletes = {json.dumps(athletes_data, cls=MongoJSONEncoder)};
-        var markers = L.markerClusterGroup({{
+        var markers = L.markerClusterGroup({
             maxClusterRadius: 30,
             spiderfyOnMaxZoom: true,
             showCoverageOnHover: true,
             zoomToBoundsOnClick: true
-        }});
-
-        var locationGroups = {{}};
-        athletes.forEach(function(athlete) {{
-            if (athlete.latitude && athlete.longitude) {{
-                var key = athlete.latitude + ',' + athlete.longitude;
-                if (!locationGroups[key]) locationGroups[key] = [];
-                locationGroups[key].push(athlete);
-            }}
-        }});
-
-        Object.keys(locationGroups).forEach(function(key) {{
-            var athletes = locationGroups[key];
-            var [lat, lng] = key.split(',');
-            var popupContent = '<div style="max-height: 200px; overflow-y: auto; font-size: 11px;">' +  // Reduced base font size
-                '<h3 style="font-size: 12px; margin: 0 0 4px 0;">' + athletes[0].Nat + '</h3>' +  // Further reduced h3
-                '<p style="margin: 0 0 4px 0; font-size: 10px;">Athletes: ' + athletes.length + '</p>' +  // Smaller count text
-                '<ul style="margin: 0; padding-left: 12px; font-size: 10px;">' +  // Smaller list font
-                athletes.map(function(a) {{
-                    return '<li style="margin-bottom: 2px;">' +  // Reduced margin
-                           '<a href="/athlete/' + encodeURIComponent(a.Competitor) + 
-                           '" style="text-decoration: none; font-size: 10px;">' +  // Explicit font size for names
-                           a['Athlete Name'] + 
-                           '</a> ' +
-                           '<span style="color: #666; font-size: 9px;">(' + a.Discipline + ')</span></li>';  // Even smaller discipline text
-                }}).join('') +
-                '</ul></div>';
-            
-            L.marker([parseFloat(lat), parseFloat(lng)])
-             .bindPopup(popupContent, {{
-                maxWidth: 200,  // Reduced popup width
-                autoPanPadding: [50, 50]
-             }})
-             .addTo(markers);
-        }});
+        });
+
+        // One marker per country; the athlete list is fetched when its popup first opens
+        markers.addLayer(L.geoJSON(countries, {
+            pointToLayer: function(feature, latlng) {
+                var props = feature.properties;
+                var marker = L.marker(latlng);
+                var tooltip = document.createElement('span');
+                tooltip.textContent = props.nat + ' (' + props.count + '): ' + props.athletes.join(', ') +
+                    (props.count > props.athletes.length ? ', …' : '');
+                marker.bindTooltip(tooltip);
+                marker.bindPopup('Loading…', {
+                    maxWidth: 200,  // Reduced popup width
+                    autoPanPadding: [50, 50]
+                });
+                marker.on('popupopen', function(e) {
+                    if (marker.popupLoaded) return;
+                    fetch('/api/map/countries/' + encodeURIComponent(props.nat))
+                        .then(response => response.text())
+                        .then(function(html) {
+                            marker.popupLoaded = true;
+                            e.popup.setContent(html);
+                        });
+                });
+                return marker;
+            }
+        }));
 
         map.addLayer(markers);
 
-        map.on('zoomend', function() {{
+        map.on('zoomend', function() {
             var currentZoom = map.getZoom();
             markers.options.maxClusterRadius = currentZoom < 5 ? 30 : 10;
             markers.refreshClusters();
-        }});
+        });
     """
 def get_analytics_script(measurement_id: str = 'G-TFWZT8GQTN') -> Script:
     return Script("""
@@ -317,17 +436,11 @@ def get_analytics_script(measurement_id: str = 'G-TFWZT8GQTN') -> Script:
 
 
 @rt("/")
-def get():
-    athletes_data = mongo_to_json_serializable(list(db.db.athlete_metadata.find({})))
-    total_athletes = len(athletes_data)
-    total_countries = len(set(athlete['Nat'] for athlete in athletes_data))
-    log_stats = parse_latest_log_stats()
-    country_coords = _init_country_coordinates()
-    for athlete in athletes_data:
-        country_code = athlete.get('Nat')
-        if country_code and country_code in country_coords:
-            athlete['latitude'] = country_coords[country_code]['lat']
-            athlete['longitude'] = country_coords[country_code]['lng']
+async def get():
+    payload = await homepage_cache.get(await data_version.current())
+    total_athletes = payload['total_athletes']
+    total_countries = payload['total_countries']
+    log_stats = payload['log_stats']
     return (
         get_analytics_script(),
         Style("""
@@ -444,8 +557,28 @@ def get():
                 const mapBtn = document.querySelector('.map-view-btn');
                 const mapContainer = document.getElementById('map');
                 
-                // Initialize data first
-                var athletes = {json.dumps(athletes_data, cls=MongoJSONEncoder)};
+                // Country points are fetched once from /api/map/countries (cached by the browser via ETag)
+                // as compact rows of [nat, lat, lng, count, names], expanded here into GeoJSON
+                let countriesPromise = null;
+                function loadCountries() {{
+                    if (!countriesPromise) {{
+                        countriesPromise = fetch('/api/map/countries')
+                            .then(response => response.json())
+                            .then(data => ({{
+                                type: 'FeatureCollection',
+                                features: data.rows.map(row => ({{
+                                    type: 'Feature',
+                                    geometry: {{type: 'Point', coordinates: [row[2], row[1]]}},
+                                    properties: {{nat: row[0], count: row[3], athletes: row[4]}}
+                                }}))
+                            }}))
+                            .catch(error => {{
+                                countriesPromise = null;
+                                throw error;
+                            }});
+                    }}
+                    return countriesPromise;
+                }}
                 
                 // Map state tracking
                 let mapInitialized = false;
@@ -463,19 +596,25 @@ def get():
                     }};
                 }}
                 
-                // Search functionality
-                const performSearch = debounce((query) => {{
+                // Search functionality (matching runs server-side on /api/search)
+                let latestQuery = '';
+                const performSearch = debounce(async (query) => {{
+                    latestQuery = query;
                     if (!query) {{
                         searchResults.innerHTML = '';
                         searchResults.classList.remove('active');
                         return;
                     }}
                     
-                    const filteredAthletes = athletes  // Now athletes is defined before this is called
-                        .filter(athlete => 
-                            athlete['Athlete Name'].toLowerCase().includes(query.toLowerCase())
-                        )
-                        .slice(0, 10);
+                    const response = await fetch('/api/search?q=' + encodeURIComponent(query));
+                    // Same compact encoding as /api/athletes: positional rows with Nat/Discipline indexes
+                    const data = await response.json();
+                    const filteredAthletes = data.rows.map(row => ({{
+                        'Athlete Name': row[0], Competitor: row[1],
+                        Nat: data.nats[row[2]], Discipline: data.disciplines[row[3]]
+                    }}));
+                    // Drop responses for queries the user has already typed past
+                    if (query !== latestQuery) return;
                     
                     const resultsHTML = filteredAthletes.length 
                         ? filteredAthletes
@@ -507,7 +646,9 @@ def get():
                     // Initialize map on first show
                     if (!isMapVisible && !mapInitialized) {{
                         mapInitialized = true;
-                        {create_map_script(athletes_data)}
+                        loadCountries().then(function(countries) {{
+                            {create_map_script()}
+                        }});
                     }}
                 }});
                 
@@ -638,25 +779,283 @@ def get():
         )
     )
 
+@rt("/api/athletes")
+async def get_athletes_api(request: Request):
+    # Roster for search and the map, served precompressed with a strong ETag
+    payload = await homepage_cache.get(await data_version.current())
+    return payload['roster'].response(request)
+
+@rt("/api/map/countries")
+async def get_country_points(request: Request):
+    payload = await homepage_cache.get(await data_version.current())
+    return payload['countries'].response(request)
+
+@rt("/api/map/countries/{nat}")
+async def get_country_popup(nat: str):
+    # Popup fragment for one country, loaded when its marker is first opened
+    payload = await homepage_cache.get(await data_version.current())
+    athletes = payload['athletes_by_country'].get(nat)
+    if athletes is None:
+        return Response("Country not found", status_code=404)
+    return HTMLResponse(to_xml(country_popup(nat, athletes)),
+                        headers={'Cache-Control': 'public, max-age=300'})
+
+@rt("/api/athlete/{athlete_id}/weekly")
+async def get_athlete_weekly(athlete_id: int, request: Request):
+    # Weekly totals per activity Type for charts, aggregated in MongoDB and cached per data version
+    version = await data_version.current()
+    key = (athlete_id, version)
+    body = athlete_weekly_cache.get(key)
+    if body is None:
+        with metrics.span('aggregate_athlete_weekly'):
+            weeks = await db.get_athlete_weekly_totals(athlete_id)
+        body = PrecompressedBody(
+            dumps_json({'athlete_id': athlete_id, 'weeks': weeks}), f'weekly-{athlete_id}'
+        )
+        athlete_weekly_cache.put(key, body)
+    return body.response(request)
+
+@rt("/api/leaderboard")
+async def get_leaderboard(type: str = 'Run', limit: int = 20):
+    # Totals come from the materialized athlete_summary, kept current by the sync
+    athletes = await db.get_summary_leaderboard(type, limit=max(1, min(limit, 100)))
+    rows = []
+    for athlete in athletes:
+        totals = athlete.get('types', {}).get(type, {})
+        # $inc sums accumulate float noise; round as the weekly totals are
+        rows.append({
+            'athlete_id': athlete['_id'], 'athlete_name': athlete.get('Athlete Name'),
+            'distance_km': round(totals.get('distance_km', 0), 2),
+            'time_min': round(totals.get('time_min', 0), 1),
+            'count': totals.get('count', 0),
+        })
+    return Response(dumps_json({'type': type, 'athletes': rows}), media_type='application/json',
+                    headers={'Cache-Control': 'public, max-age=60'})
+
+@rt("/api/search")
+async def search_athletes_api(q: str = '', limit: int = 10):
+    await homepage_cache.get(await data_version.current())  # Syncs the index when a new version lands
+    results = search_index.search(q, limit=max(1, min(limit, 50)))
+    return Response(dumps_json(encode_roster(results)), media_type='application/json',
+                    headers={'Cache-Control': 'public, max-age=60'})
+
+def activity_row(row: dict, fallback_id: str):
+    """Render one activity as a table row; `fallback_id` keys the description box when there is no Activity ID"""
+    row_id = row.get('Activity ID') or fallback_id
+    # Check description exists and is a string before using strip()
+    has_description = isinstance(row.get('Description'), str) and row.get('Description', '').strip()
+    return Tr(
+        # Precomputed at ingest; format_date covers documents not yet migrated
+        Td(row.get('Start Date Display') or format_date(row.get('Start Date'))),
+        Td(
+            Div(
+                Div(
+                    A(
+                        row.get('Activity Name'),
+                        href=f"https://strava.com/activities/{row.get('Activity ID')}" if row.get('Activity ID') else None,
+                        cls="strava-link",
+                        target="_blank"
+                    ) if row.get('Activity ID') else row.get('Activity Name'),
+                    Span(" 🔽", cls="dropdown-trigger", onclick=f"toggleDescription(event, '{row_id}')")
+                    if has_description else "",
+                    cls="activity-name"
+                ),
+                Div(row.get('Description', ''), cls="description-box", id=f"desc-{row_id}")
+                if has_description else "",
+                cls="activity-cell"
+            ) if row.get('Activity Name') else "-"
+        ),
+        Td(row.get('Type')),
+        Td(f"{row.get('Distance (km)', 0):.2f}"),
+        Td(f"{row.get('Time (min)', 0):.1f}"),
+        Td(f"{row.get('Pace (min/km)', 0):.2f}"),
+    )
+
+def parse_cursor_date(value: str):
+    """Keyset cursor dates travel as ISO strings; Start Date is stored as a naive UTC BSON date"""
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return value
+    # Offsets only appear in raw strings from activities loaded before Start Date
+    # was typed; those documents still compare as strings
+    return value if parsed.tzinfo is not None else parsed
+
+def load_more_row(athlete_name: str, page: list):
+    """Row that fetches the next page of activities when clicked or scrolled into view"""
+    last = page[-1]
+    start_date = last.get('Start Date')
+    if isinstance(start_date, datetime):
+        start_date = start_date.isoformat()
+    # Undated rows sort last; their cursor is the Activity ID alone
+    cursor = {'before_date': start_date, 'before_id': last.get('Activity ID')}
+    params = urlencode({key: value for key, value in cursor.items() if value is not None})
+    return Tr(
+        Td(
+            A("Load more activities", href="#", onclick="event.preventDefault()"),
+            colspan="6",
+            style="text-align: center;"
+        ),
+        hx_get=f"/athlete/{quote(athlete_name)}/activities?{params}",
+        hx_trigger="click, revealed",
+        hx_swap="outerHTML",
+        cls="load-more"
+    )
+
+@rt("/athlete/{name}/activities")
+async def get_athlete_activities_page(name: str, before_date: str = None, before_id: int = None):
+    # HTMX fragment: the next page of activity rows plus a new load-more row
+    decoded_name = unquote(name)
+    before = None
+    if before_id is not None:
+        before = (parse_cursor_date(before_date) if before_date is not None else None, before_id)
+    activities, has_more = await db.get_athlete_activities_page(
+        decoded_name, limit=ACTIVITIES_PAGE_SIZE, before=before
+    )
+    offset = f"{before_id}-" if before_id is not None else ""
+    return (
+        *[activity_row(row, f"{offset}{i}") for i, row in enumerate(activities)],
+        load_more_row(decoded_name, activities) if has_more else "",
+    )
+
+async def athlete_page_key(athlete_name: str) -> tuple:
+    # Lookups are case-insensitive, so "aaron ahl" and "Aaron Ahl" share one cache entry
+    return (athlete_name.strip().casefold(), await data_version.current())
+
+@rt("/api/cache/stats")
+def get_cache_stats():
+    return JSONResponse({
+        'athlete_pages': athlete_page_cache.stats(),
+        'athlete_weekly': athlete_weekly_cache.stats(),
+    })
+
+def collect_cache_metrics() -> list:
+    lines = []
+    for prefix, cache in (('athlete_page_cache', athlete_page_cache),
+                          ('athlete_weekly_cache', athlete_weekly_cache)):
+        stats = cache.stats()
+        for name in ('hits', 'misses', 'evictions'):
+            lines += [f'# TYPE {prefix}_{name}_total counter',
+                      f'{prefix}_{name}_total {stats[name]}']
+        lines += [f'# TYPE {prefix}_size gauge', f"{prefix}_size {stats['size']}"]
+    return lines
+
+metrics.add_collector(collect_cache_metrics)
+
+@rt("/healthz")
+async def get_healthz():
+    try:
+        health = await db.health()
+    except Exception as e:
+        return JSONResponse({'status': 'error', 'error': str(e)}, status_code=503,
+                            headers={'Cache-Control': 'no-store'})
+    return JSONResponse({'status': 'ok', **health}, headers={'Cache-Control': 'no-store'})
+
+@rt("/metrics")
+def get_metrics():
+    # Prometheus text exposition format
+    return Response(metrics.render(), media_type='text/plain; version=0.0.4; charset=utf-8')
+
 @rt("/athlete/{name}")
-def get_athlete(name: str):
+async def get_athlete(name: str, request: Request, view: str = None):
     # URL decode the name parameter
     decoded_name = unquote(name)
+    if view == 'all':
+        # Whole history, streamed; not cached since it grows with the athlete
+        return await stream_athlete_page(request, decoded_name)
     
-    athlete = db.get_athlete_metadata(decoded_name)
+    key = await athlete_page_key(decoded_name)
+    page = athlete_page_cache.get(key)
+    if page is None:
+        page = await render_athlete_page(decoded_name)
+        if page is None:
+            return "Athlete not found", 404
+        athlete_page_cache.put(key, page)
+    title, body = page
+    return Title(title), NotStr(body)
+
+async def with_training_totals(athlete: Optional[dict]) -> Optional[dict]:
+    """Overlay the live totals from athlete_summary on the (offline) athlete_metadata ones"""
+    if not athlete or not athlete.get('Athlete ID'):
+        return athlete
+    summary = await db.get_athlete_summary(athlete['Athlete ID'])
+    return {**athlete, **summary_stats(summary)} if summary else athlete
+
+async def render_athlete_page(decoded_name: str) -> Optional[tuple]:
+    """Render an athlete page to (title, body HTML), or None if the athlete is unknown"""
+    athlete = await with_training_totals(await db.get_athlete_metadata(decoded_name))
     if not athlete:
-        return "Athlete not found", 404
+        return None
+    # Canonical spelling, so cached pages don't depend on the casing of the first request
+    decoded_name = athlete.get('Competitor') or decoded_name
     
-    athlete_activities = db.get_athlete_activities(decoded_name)
+    # First paint only needs the newest page; older pages load through HTMX
+    athlete_activities, has_more = await db.get_athlete_activities_page(
+        decoded_name, limit=ACTIVITIES_PAGE_SIZE
+    )
     
     athlete_strava_id = athlete_activities[0].get('Athlete ID') if athlete_activities else None
-    
+    # Building the FT tree is most of the render cost, so it is inside the span with to_xml
+    with metrics.span('render_athlete_page'):
+        rows = (
+            *[activity_row(row, f"{i}") for i, row in enumerate(athlete_activities)],
+            load_more_row(decoded_name, athlete_activities) if has_more else "",
+        )
+        title, body = athlete_page(athlete, decoded_name, athlete_strava_id, rows, show_all_link=has_more)
+        return title, to_xml(body)
+
+# Stands in for the activity rows when the page shell is rendered for streaming
+ACTIVITY_ROWS_MARKER = '<!-- activity-rows -->'
+
+async def stream_athlete_page(request: Request, decoded_name: str):
+    """Full activity history as a streamed page
+
+    The document up to the activity table (head, header, season's best cards,
+    stats) is flushed first; rows follow in STREAM_CHUNK_ROWS chunks read
+    from the Mongo cursor, so memory stays bounded however long the history is.
+    """
+    athlete = await with_training_totals(await db.get_athlete_metadata(decoded_name))
+    if not athlete:
+        return "Athlete not found", 404
+    decoded_name = athlete.get('Competitor') or decoded_name
+
+    cursor = db.iter_athlete_activities(decoded_name, batch_size=STREAM_CHUNK_ROWS)
+    # The header links to Strava using the ID carried on the activities
+    first = await anext(cursor, None)
+    athlete_strava_id = first.get('Athlete ID') if first else None
+    title, body = athlete_page(athlete, decoded_name, athlete_strava_id, (NotStr(ACTIVITY_ROWS_MARKER),))
+    # Same head and wrapper FastHTML would add, built from the app's hdrs on the request
+    head, tail = to_xml(respond(request, [Title(title)], (body,))).split(ACTIVITY_ROWS_MARKER, 1)
+
+    async def chunks():
+        yield head
+        try:
+            chunk = [activity_row(first, "0")] if first else []
+            index = len(chunk)
+            async for row in cursor:
+                chunk.append(activity_row(row, f"{index}"))
+                index += 1
+                if len(chunk) >= STREAM_CHUNK_ROWS:
+                    yield ''.join(to_xml(tr) for tr in chunk)
+                    chunk = []
+            if chunk:
+                yield ''.join(to_xml(tr) for tr in chunk)
+        finally:
+            await cursor.close()
+        yield tail
+
+    return StreamingResponse(chunks(), media_type='text/html; charset=utf-8')
+
+def athlete_page(athlete: dict, decoded_name: str, athlete_strava_id, rows: tuple,
+                 show_all_link: bool = False) -> tuple:
+    """Build (title, body FT) for an athlete page with `rows` inside the activities table"""
     # Process marks and disciplines
     marks = athlete.get('Mark', '').split('|') if athlete.get('Mark') else []
     disciplines = athlete.get('Discipline', '').split('|') if athlete.get('Discipline') else []
     event_times = list(zip(disciplines, marks)) if marks and disciplines else []
 
-    return Titled(f"{decoded_name} - Elite Runners Database",
+    title = f"{decoded_name} - Elite Runners Database"
+    body = Main(H1(title), cls="container")(
         get_analytics_script(),
         Style("""
             /* Custom styles on top of Pico */
@@ -831,6 +1230,8 @@ def get_athlete(name: str):
                     cls="grid athlete-stats"
                 ),
                 H2("Recent Activities"),
+                P(A("View all activities", href=f"/athlete/{quote(decoded_name)}?view=all"))
+                if show_all_link else "",
                 Table(
                     Tr(
                         Th("Date"),
@@ -840,39 +1241,14 @@ def get_athlete(name: str):
                         Th("Time (min)"),
                         Th("Pace (min/km)"),
                     ),
-                   *[Tr(
-                        Td(format_date(row.get('Start Date'))),
-                        Td(
-                            Div(
-                                Div(
-                                    A(
-                                        row.get('Activity Name'),
-                                        href=f"https://strava.com/activities/{row.get('Activity ID')}" if row.get('Activity ID') else None,
-                                        cls="strava-link",
-                                        target="_blank"
-                                    ) if row.get('Activity ID') else row.get('Activity Name'),
-                                    # Fix: Check if description exists and is a string before using strip()
-                                    Span(" 🔽", cls="dropdown-trigger", onclick=f"toggleDescription(event, {i})")
-                                    if isinstance(row.get('Description'), str) and row.get('Description', '').strip() else "",
-                                    cls="activity-name"
-                                ),
-                                # Fix: Check if description exists and is a string before using strip()
-                                Div(row.get('Description', ''), cls="description-box", id=f"desc-{i}")
-                                if isinstance(row.get('Description'), str) and row.get('Description', '').strip() else "",
-                                cls="activity-cell"
-                            ) if row.get('Activity Name') else "-"
-                        ),
-                        Td(row.get('Type')),
-                        Td(f"{row.get('Distance (km)', 0):.2f}"),
-                        Td(f"{row.get('Time (min)', 0):.1f}"),
-                        Td(f"{row.get('Pace (min/km)', 0):.2f}"),
-                    ) for i, row in enumerate(athlete_activities)],
+                    *rows,
                     cls="activities-table"
                 ),
                 cls="container"
             )
         )
     )
+    return title, body
 
 if __name__ == "__main__":
     serve(host='0.0.0.0', port=8000)
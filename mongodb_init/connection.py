@@ -1,5 +1,112 @@
-from pymongo import MongoClient
-from config.settings import MONGO_URI
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from pymongo import AsyncMongoClient, MongoClient
+from config.settings import (
+    MONGO_COMPRESSORS, MONGO_CONNECT_TIMEOUT_MS, MONGO_MAX_POOL_SIZE, MONGO_MIN_POOL_SIZE,
+    MONGO_SERVER_SELECTION_TIMEOUT_MS, MONGO_SOCKET_TIMEOUT_MS, MONGO_URI, STORAGE_BACKEND
+)
+from mongodb_init.indexes import CASE_INSENSITIVE, ensure_indexes, ensure_indexes_async
+from mongodb_init.summary import COLLECTION as SUMMARY_COLLECTION, leaderboard_query
+from utils.metrics import MongoCommandMetrics, MongoPoolMetrics
+
+# Fields rendered in the activity table; skips _id, Serial, Location, raw Time strings, etc.
+ACTIVITY_PROJECTION = {
+    '_id': 0,
+    'Athlete ID': 1,
+    'Activity ID': 1,
+    'Activity Name': 1,
+    'Description': 1,
+    'Start Date': 1,
+    'Start Date Display': 1,
+    'Type': 1,
+    'Distance (km)': 1,
+    'Time (min)': 1,
+    'Pace (min/km)': 1,
+}
+ACTIVITY_SORT = [("Start Date", -1), ("Activity ID", -1)]
+
+# The only athlete_metadata fields the homepage map and search use
+ROSTER_PROJECTION = {
+    '_id': 0,
+    'Athlete Name': 1,
+    'Competitor': 1,
+    'Nat': 1,
+    'Discipline': 1,
+}
+
+
+def apply_projection(document: dict, projection: dict) -> dict:
+    """`document` with only the fields an inclusion projection keeps, as find() returns them
+
+    For backends that store whole documents (SQLite, the in-memory benchmark stand-in).
+    """
+    fields = [key for key, include in projection.items() if include and key != '_id']
+    return {key: document[key] for key in fields if key in document}
+
+
+def client_options() -> dict:
+    """Pool, timeout and compression settings shared by both clients"""
+    options = {
+        'maxPoolSize': MONGO_MAX_POOL_SIZE,
+        'minPoolSize': MONGO_MIN_POOL_SIZE,
+        'serverSelectionTimeoutMS': MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        'connectTimeoutMS': MONGO_CONNECT_TIMEOUT_MS,
+        'socketTimeoutMS': MONGO_SOCKET_TIMEOUT_MS,
+    }
+    if MONGO_COMPRESSORS:
+        options['compressors'] = MONGO_COMPRESSORS
+    return options
+
+
+def weekly_totals_pipeline(athlete_id: int) -> list:
+    """Aggregation of an athlete's activities into ISO-week totals per activity Type
+
+    Uses the (Athlete ID, Start Date) index; activities without a typed
+    Start Date are skipped. Each result is one (week, Type) with distance,
+    time and activity count, oldest week first.
+    """
+    return [
+        {'$match': {'Athlete ID': athlete_id, 'Start Date': {'$type': 'date'}}},
+        {'$group': {
+            '_id': {
+                'year': {'$isoWeekYear': '$Start Date'},
+                'week': {'$isoWeek': '$Start Date'},
+                'type': '$Type',
+            },
+            'distance_km': {'$sum': '$Distance (km)'},
+            'time_min': {'$sum': '$Time (min)'},
+            'count': {'$sum': 1},
+        }},
+        {'$sort': {'_id.year': 1, '_id.week': 1, '_id.type': 1}},
+        {'$project': {
+            '_id': 0,
+            'year': '$_id.year',
+            'week': '$_id.week',
+            # Monday of the ISO week, for chart axes
+            'week_start': {'$dateToString': {'format': '%Y-%m-%d', 'date': {'$dateFromParts': {
+                'isoWeekYear': '$_id.year', 'isoWeek': '$_id.week', 'isoDayOfWeek': 1,
+            }}}},
+            'type': '$_id.type',
+            'distance_km': {'$round': ['$distance_km', 2]},
+            'time_min': {'$round': ['$time_min', 1]},
+            'count': 1,
+        }},
+    ]
+
+
+def _activities_page_query(athlete_name: str, before=None) -> dict:
+    # Keyset condition: rows strictly older than (Start Date, Activity ID) of `before`.
+    # Undated rows sort last (nulls are lowest), so they follow every dated row and a
+    # cursor with no Start Date pages through them by Activity ID alone.
+    query = {"Athlete Name": athlete_name.strip()}
+    if before is not None:
+        start_date, activity_id = before
+        query["$or"] = [{"Start Date": start_date, "Activity ID": {"$lt": activity_id}}]
+        if start_date is not None:
+            query["$or"] += [{"Start Date": {"$lt": start_date}}, {"Start Date": None}]
+    return query
+
 
 class DatabaseConnection:
     _instance = None
@@ -11,21 +118,247 @@ class DatabaseConnection:
         return cls._instance
     
     def __init__(self):
-        self.client = MongoClient(MONGO_URI)
-        self.db = self.client['elite_endurance']
+        self._client = None
+
+    @property
+    def client(self):
+        # Created on first use, so importing a module that holds an instance stays cheap
+        if self._client is None:
+            self._client = MongoClient(MONGO_URI, **client_options())
+        return self._client
+
+    @property
+    def db(self):
+        return self.client['elite_endurance']
+    
+    def ensure_indexes(self):
+        ensure_indexes(self.db)
     
     def get_athlete_metadata(self, athlete_name: str):
-        # Make case-insensitive search
+        # Case-insensitive exact match, served by the competitor_ci collation index
         athlete_name = athlete_name.strip()
-        result = self.db.athlete_metadata.find_one({
-            "Competitor": {"$regex": f"^{athlete_name}$", "$options": "i"}
-        })
-        return result
+        return self.db.athlete_metadata.find_one(
+            {"Competitor": athlete_name},
+            collation=CASE_INSENSITIVE
+        )
 
     def get_athlete_activities(self, athlete_name: str):
-        # Make case-insensitive search
+        # Case-insensitive exact match, served by the athlete_name_start_date_activity_ci collation index
+        athlete_name = athlete_name.strip()
+        return list(self.db.activities.find(
+            {"Athlete Name": athlete_name},
+            collation=CASE_INSENSITIVE
+        ).sort("Start Date", -1))
+    
+    def get_athlete_activities_page(self, athlete_name: str, limit: int = 50, before=None):
+        """Return one page of an athlete's activities, newest first
+
+        Uses keyset pagination: `before` is the (Start Date, Activity ID) of
+        the last row of the previous page, so each page is a bounded index
+        range scan regardless of how deep the user has scrolled. Start Date
+        is None when that row had none.
+
+        Returns:
+            Tuple of (activities, has_more)
+        """
+        query = _activities_page_query(athlete_name, before)
+        activities = list(self.db.activities.find(
+            query,
+            ACTIVITY_PROJECTION,
+            collation=CASE_INSENSITIVE
+        ).sort(ACTIVITY_SORT).limit(limit + 1))
+        return activities[:limit], len(activities) > limit
+    
+    def get_athlete_weekly_totals(self, athlete_id: int):
+        """Weekly distance, time and activity count per Type, computed in MongoDB"""
+        return list(self.db.activities.aggregate(weekly_totals_pipeline(athlete_id)))
+    
+    def get_athlete_summary(self, athlete_id: int):
+        """Materialized training totals for an athlete (see mongodb_init/summary.py)"""
+        return self.db[SUMMARY_COLLECTION].find_one({'_id': athlete_id})
+    
+    def get_summary_leaderboard(self, activity_type: str = 'Run', limit: int = 20):
+        """Athletes with the most distance for `activity_type`, most first"""
+        query, projection, sort = leaderboard_query(activity_type)
+        return list(self.db[SUMMARY_COLLECTION].find(query, projection).sort(sort).limit(limit))
+    
+    def get_latest_update_log(self):
+        # Latest sync entry, used as the data version for caches
+        return self.db.update_logs.find_one(sort=[('timestamp', -1)])
+
+
+class AsyncStorageBackend(ABC):
+    """Read interface the web routes use; see get_async_database for the implementations
+
+    Documents come back in the normalized MongoDB shape (schemas.py),
+    whichever store they are read from.
+    """
+    @abstractmethod
+    async def ensure_indexes(self): ...
+
+    @abstractmethod
+    async def warm_up(self): ...
+
+    @abstractmethod
+    async def health(self) -> dict: ...
+
+    @abstractmethod
+    async def get_athlete_metadata(self, athlete_name: str): ...
+
+    @abstractmethod
+    async def get_athlete_activities(self, athlete_name: str): ...
+
+    @abstractmethod
+    async def get_athlete_activities_page(self, athlete_name: str, limit: int = 50, before=None): ...
+
+    @abstractmethod
+    def iter_athlete_activities(self, athlete_name: str, batch_size: int = 200): ...
+
+    @abstractmethod
+    async def get_roster(self): ...
+
+    @abstractmethod
+    async def get_athlete_weekly_totals(self, athlete_id: int): ...
+
+    @abstractmethod
+    async def get_athlete_summary(self, athlete_id: int): ...
+
+    @abstractmethod
+    async def get_summary_leaderboard(self, activity_type: str = 'Run', limit: int = 20): ...
+
+    @abstractmethod
+    async def get_latest_update_log(self): ...
+
+
+def get_async_database() -> AsyncStorageBackend:
+    """The storage backend selected by STORAGE_BACKEND in config/settings.py
+
+    Raises:
+        ValueError: If STORAGE_BACKEND names no known backend
+    """
+    if STORAGE_BACKEND == 'mongo':
+        return AsyncDatabaseConnection.get_instance()
+    if STORAGE_BACKEND == 'sqlite':
+        from mongodb_init.sqlite_store import SQLiteDatabaseConnection
+        return SQLiteDatabaseConnection.get_instance()
+    raise ValueError(f"Unknown STORAGE_BACKEND {STORAGE_BACKEND!r}; expected 'mongo' or 'sqlite'")
+
+
+class AsyncDatabaseConnection(AsyncStorageBackend):
+    """Non-blocking counterpart of DatabaseConnection for the web routes
+
+    Uses pymongo's AsyncMongoClient, so a single uvicorn worker can keep
+    many queries in flight instead of parking each one on a threadpool
+    thread.
+    """
+    _instance = None
+    
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+    
+    def __init__(self):
+        self._client = None
+        self.pool_metrics = MongoPoolMetrics()
+
+    @property
+    def client(self):
+        # Created by the first query rather than at import, keeping serverless cold starts short
+        if self._client is None:
+            # The listeners feed per-collection latency and pool usage into /metrics
+            self._client = AsyncMongoClient(
+                MONGO_URI,
+                event_listeners=[MongoCommandMetrics(), self.pool_metrics],
+                **client_options()
+            )
+        return self._client
+
+    @property
+    def db(self):
+        return self.client['elite_endurance']
+    
+    async def ensure_indexes(self):
+        await ensure_indexes_async(self.db)
+
+    async def warm_up(self):
+        """Open the minimum pool and create indexes, so early requests skip connection setup
+
+        Concurrent pings each hold a connection, which makes the pool open
+        MONGO_MIN_POOL_SIZE of them up front instead of one per cold request.
+        """
+        await asyncio.gather(*(
+            self.client.admin.command('ping') for _ in range(max(1, MONGO_MIN_POOL_SIZE))
+        ))
+        await self.ensure_indexes()
+
+    async def health(self) -> dict:
+        """Ping the server and report round-trip time and pool statistics
+
+        Raises:
+            pymongo.errors.PyMongoError: If the server cannot be reached
+        """
+        start = time.perf_counter()
+        await self.client.admin.command('ping')
+        return {
+            'ping_ms': round((time.perf_counter() - start) * 1000, 2),
+            'pool': {
+                'max_size': MONGO_MAX_POOL_SIZE,
+                'min_size': MONGO_MIN_POOL_SIZE,
+                'servers': self.pool_metrics.stats(),
+            },
+        }
+    
+    async def get_athlete_metadata(self, athlete_name: str):
         athlete_name = athlete_name.strip()
-        return list(self.db.activities.find({
-            "Athlete Name": {"$regex": f"^{athlete_name}$", "$options": "i"}
-        }).sort("Start Date", -1))
+        return await self.db.athlete_metadata.find_one(
+            {"Competitor": athlete_name},
+            collation=CASE_INSENSITIVE
+        )
+
+    async def get_athlete_activities(self, athlete_name: str):
+        athlete_name = athlete_name.strip()
+        return await self.db.activities.find(
+            {"Athlete Name": athlete_name},
+            collation=CASE_INSENSITIVE
+        ).sort("Start Date", -1).to_list()
+
+    async def get_athlete_activities_page(self, athlete_name: str, limit: int = 50, before=None):
+        """See DatabaseConnection.get_athlete_activities_page"""
+        activities = await self.db.activities.find(
+            _activities_page_query(athlete_name, before),
+            ACTIVITY_PROJECTION,
+            collation=CASE_INSENSITIVE
+        ).sort(ACTIVITY_SORT).limit(limit + 1).to_list()
+        return activities[:limit], len(activities) > limit
+
+    def iter_athlete_activities(self, athlete_name: str, batch_size: int = 200):
+        """Async cursor over all of an athlete's activities, newest first
+
+        Documents are fetched `batch_size` at a time, so callers can stream
+        them without holding the full history in memory.
+        """
+        return self.db.activities.find(
+            {"Athlete Name": athlete_name.strip()},
+            ACTIVITY_PROJECTION,
+            collation=CASE_INSENSITIVE
+        ).sort(ACTIVITY_SORT).batch_size(batch_size)
+
+    async def get_roster(self):
+        return await self.db.athlete_metadata.find({}, ROSTER_PROJECTION).to_list()
+    
+    async def get_athlete_weekly_totals(self, athlete_id: int):
+        """See DatabaseConnection.get_athlete_weekly_totals"""
+        cursor = await self.db.activities.aggregate(weekly_totals_pipeline(athlete_id))
+        return await cursor.to_list()
+    
+    async def get_athlete_summary(self, athlete_id: int):
+        return await self.db[SUMMARY_COLLECTION].find_one({'_id': athlete_id})
+    
+    async def get_summary_leaderboard(self, activity_type: str = 'Run', limit: int = 20):
+        query, projection, sort = leaderboard_query(activity_type)
+        return await self.db[SUMMARY_COLLECTION].find(query, projection).sort(sort).limit(limit).to_list()
     
+    async def get_latest_update_log(self):
+        return await self.db.update_logs.find_one(sort=[('timestamp', -1)])
@@ -1,9 +1,16 @@
 from pymongo import MongoClient
 from dotenv import load_dotenv
+import argparse
 import os
+import time
+import uuid
 import pandas as pd
 import logging
 from datetime import datetime
+from indexes import INDEXES, ensure_collection_indexes, ensure_indexes
+from schemas import normalize_records
+from summary import COLLECTION as SUMMARY_COLLECTION, SUMMARY_FIELDS, apply_summary_changes, rebuild_summary
+from sync import MAX_DELETE_FRACTION, SYNC_KEYS, add_sync_hashes, sync_collection
 
 load_dotenv()
 
@@ -14,38 +21,135 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def refresh_mongodb_data():
-    """Refresh MongoDB collections with latest CSV data"""
+# collection -> CSV it is loaded from (paths relative to mongodb_init/)
+SOURCES = {
+    'athlete_metadata': '../cleaned_athlete_metadata.csv',
+    'master_iaaf': '../data/metadata/master_iaaf_database_with_strava.csv',
+    'activities': '../indiv_activities_full.csv',
+}
+
+STAGING_SUFFIX = '_staging'
+
+# Share of CSV rows normalize_records may drop (missing required fields)
+# before a full reload refuses to swap the staged copy in
+MAX_DROPPED_FRACTION = 0.01
+
+def load_staging(db, collection: str, documents: list, csv_rows: int):
+    """Load `documents` into '<collection>_staging' with its indexes and check the count
+
+    Args:
+        csv_rows: Rows in the source CSV, before normalize_records dropped any
+
+    Raises:
+        ValueError: If nothing was staged, the staged count differs from
+            `documents`, or more than MAX_DROPPED_FRACTION of the CSV rows
+            were dropped during normalization
+    """
+    staging = db[collection + STAGING_SUFFIX]
+    staging.drop()  # Leftover from an interrupted run
+    if documents:
+        staging.insert_many(add_sync_hashes(documents), ordered=False)
+    # Built before the swap, so queries never hit the new collection unindexed
+    ensure_collection_indexes(staging, collection)
+    loaded = staging.count_documents({})
+    problem = None
+    if loaded == 0:
+        problem = f"staged no documents from {csv_rows} CSV rows"
+    elif loaded != len(documents):
+        problem = f"staged {loaded} documents, expected {len(documents)}"
+    elif csv_rows - loaded > MAX_DROPPED_FRACTION * csv_rows:
+        problem = f"staged {loaded} of {csv_rows} CSV rows (more than {MAX_DROPPED_FRACTION:.0%} dropped)"
+    if problem:
+        staging.drop()
+        raise ValueError(f"{collection}: {problem}; keeping the live collection")
+    logger.info(f"Staged {loaded} records for {collection} collection")
+
+def swap_in(db, collection: str):
+    # renameCollection within a database is atomic: readers see the old or the new data, never neither
+    db[collection + STAGING_SUFFIX].rename(collection, dropTarget=True)
+    logger.info(f"Swapped {collection}{STAGING_SUFFIX} into {collection}")
+
+def recover_summary(db, batch_size: int):
+    """Resync athlete_summary after a failed activities sync
+
+    Batches written before the failure are committed with their sync hashes,
+    so the next run sees them as unchanged and would never apply their
+    deltas. Rebuild from what was committed; if that fails too, drop the
+    summary so the next run rebuilds it.
+    """
+    try:
+        rebuild_summary(db, batch_size, INDEXES[SUMMARY_COLLECTION])
+    except Exception as e:
+        logger.error(f"Rebuilding {SUMMARY_COLLECTION} after a failed sync failed ({e}); dropping it")
+        db[SUMMARY_COLLECTION].drop()
+
+def refresh_mongodb_data(incremental: bool = True, batch_size: int = 1000, allow_mass_delete: bool = False):
+    """Refresh MongoDB collections with latest CSV data
+
+    Incremental mode (the default) upserts and deletes only the documents
+    that differ from the CSVs, keeping the collections and their indexes in
+    place. With incremental=False every collection is reloaded into a
+    staging copy, indexed and validated, then swapped in with
+    renameCollection, so live readers never see an empty collection.
+    An incremental run that would delete more than sync.MAX_DELETE_FRACTION
+    of a collection fails instead, unless allow_mass_delete is set.
+
+    Either way a new `version` is written to update_logs once at the end
+    (kept unchanged when an incremental run changed nothing), which
+    invalidates the web app's caches exactly once.
+    """
     # Connect to MongoDB Atlas
     MONGO_URI = os.getenv("MONGO_URI")
     client = MongoClient(MONGO_URI)
     db = client['elite_endurance']
+    started = time.perf_counter()
     
     try:
-        # Update athlete metadata
-        athlete_metadata = pd.read_csv('../cleaned_athlete_metadata.csv')
-        db['athlete_metadata'].drop()
-        db['athlete_metadata'].insert_many(athlete_metadata.to_dict(orient='records'))
-        logger.info(f"Uploaded {len(athlete_metadata)} records to athlete_metadata collection")
-        
-        # Update master IAAF database
-        master_iaaf = pd.read_csv('../data/metadata/master_iaaf_database_with_strava.csv')
-        db['master_iaaf'].drop()
-        db['master_iaaf'].insert_many(master_iaaf.to_dict(orient='records'))
-        logger.info(f"Uploaded {len(master_iaaf)} records to master_iaaf collection")
-        
-        # Update individual activities
-        activities = pd.read_csv('../indiv_activities_full.csv')
-        db['activities'].drop()
-        db['activities'].insert_many(activities.to_dict(orient='records'))
-        logger.info(f"Uploaded {len(activities)} records to activities collection")
-
-        log_entry = {
-            'timestamp': datetime.now(),
-            'athlete_metadata_count': len(athlete_metadata),
-            'master_iaaf_count': len(master_iaaf),
-            'activities_count': len(activities)
-        }
+        log_entry = {'timestamp': datetime.now(), 'mode': 'incremental' if incremental else 'full'}
+        changed = not incremental
+        staged = []
+        # Deltas need a complete summary to apply to; otherwise build it from scratch below
+        summary_ready = incremental and db[SUMMARY_COLLECTION].estimated_document_count() > 0
+        for collection, path in SOURCES.items():
+            df = pd.read_csv(path)
+            documents = normalize_records(df, collection)
+            if incremental:
+                if collection == 'activities' and summary_ready:
+                    # Keep athlete_summary current from the same diff
+                    tracking = {
+                        'track_fields': SUMMARY_FIELDS,
+                        'on_change': lambda added, removed: apply_summary_changes(db, added, removed, batch_size),
+                    }
+                else:
+                    tracking = {}
+                if allow_mass_delete:
+                    tracking['max_delete_fraction'] = None
+                try:
+                    changes = sync_collection(db[collection], documents, SYNC_KEYS[collection], batch_size, **tracking)
+                except Exception:
+                    if 'on_change' in tracking:
+                        recover_summary(db, batch_size)
+                    raise
+                log_entry[f'{collection}_changes'] = changes
+                changed = changed or any(changes[k] for k in ('inserted', 'updated', 'deleted'))
+            else:
+                load_staging(db, collection, documents, len(df))
+                staged.append(collection)
+            log_entry[f'{collection}_count'] = len(documents)
+
+        # Swap only once every collection has staged cleanly, so they change together
+        for collection in staged:
+            swap_in(db, collection)
+        if not summary_ready:
+            rebuild_summary(db, batch_size, INDEXES[SUMMARY_COLLECTION])
+
+        # A no-op when the indexes already exist
+        ensure_indexes(db)
+        logger.info("Ensured collection indexes")
+
+        previous = db['update_logs'].find_one(sort=[('timestamp', -1)]) or {}
+        log_entry['version'] = uuid.uuid4().hex if changed or not previous.get('version') else previous['version']
+        log_entry['duration_s'] = round(time.perf_counter() - started, 2)
         db['update_logs'].insert_one(log_entry)
         
         return True
@@ -57,4 +161,11 @@ def refresh_mongodb_data():
         client.close()
 
 if __name__ == "__main__":
-    refresh_mongodb_data()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Refresh MongoDB collections from the CSVs")
+    parser.add_argument('--full', action='store_true', help='reload every collection through a staging copy and swap it in')
+    parser.add_argument('--batch-size', type=int, default=1000, help='operations per bulk_write')
+    parser.add_argument('--allow-mass-delete', action='store_true',
+                        help=f'let an incremental run delete more than {MAX_DELETE_FRACTION:.0%}% of a collection')
+    args = parser.parse_args()
+    refresh_mongodb_data(incremental=not args.full, batch_size=args.batch_size,
+                         allow_mass_delete=args.allow_mass_delete)
\ No newline at end of file
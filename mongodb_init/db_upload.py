@@ -2,6 +2,7 @@ from pymongo import MongoClient
 from dotenv import load_dotenv
 import os
 import pandas as pd
+from schemas import normalize_records
 
 load_dotenv()
 
@@ -22,11 +23,11 @@ athlete_metadata = pd.read_csv(metadata_csv_path)
 activities = pd.read_csv(activities_csv_path)
 
 # Insert athlete metadata into 'athlete_metadata' collection
-athlete_metadata_dict = athlete_metadata.to_dict(orient='records')
+athlete_metadata_dict = normalize_records(athlete_metadata, 'athlete_metadata')
 db['athlete_metadata'].insert_many(athlete_metadata_dict)
 
 # Insert activities into 'activities' collection
-activities_dict = activities.to_dict(orient='records')
+activities_dict = normalize_records(activities, 'activities')
 db['activities'].insert_many(activities_dict)
 
 print("Data uploaded successfully!")
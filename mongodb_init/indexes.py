@@ -0,0 +1,53 @@
+from pymongo import ASCENDING, DESCENDING
+from pymongo.collation import Collation, CollationStrength
+
+# Case-insensitive comparison; queries must pass the same collation to use the indexes below
+CASE_INSENSITIVE = Collation(locale='en', strength=CollationStrength.SECONDARY)
+
+# collection -> list of (keys, options) passed to create_index
+INDEXES = {
+    'athlete_metadata': [
+        ([('Competitor', ASCENDING)], {'name': 'competitor_ci', 'collation': CASE_INSENSITIVE}),
+        ([('Athlete Name', ASCENDING)], {'name': 'athlete_name_ci', 'collation': CASE_INSENSITIVE}),
+    ],
+    'activities': [
+        # Serves name lookups and keyset pagination on (Start Date, Activity ID)
+        ([('Athlete Name', ASCENDING), ('Start Date', DESCENDING), ('Activity ID', DESCENDING)],
+         {'name': 'athlete_name_start_date_activity_ci', 'collation': CASE_INSENSITIVE}),
+        # Date-range queries across athletes; Start Date is a BSON date, so ranges compare chronologically
+        ([('Start Date', DESCENDING)], {'name': 'start_date_desc'}),
+        # Per-athlete weekly aggregation: $match on Athlete ID and a Start Date range
+        ([('Athlete ID', ASCENDING), ('Start Date', DESCENDING)], {'name': 'athlete_id_start_date'}),
+    ],
+    'athlete_summary': [
+        # Distance leaderboard; other Types fall back to a scan of the (small) collection
+        ([('types.Run.distance_km', DESCENDING)], {'name': 'run_distance_desc'}),
+    ],
+    'update_logs': [
+        ([('timestamp', DESCENDING)], {'name': 'timestamp_desc'}),
+    ],
+}
+
+
+def ensure_indexes(db):
+    """Create the indexes the web app relies on
+
+    Safe to call repeatedly: create_index is a no-op for an index that
+    already exists with the same options. Run it at startup and after any
+    sync that drops collections.
+    """
+    for collection in INDEXES:
+        ensure_collection_indexes(db[collection], collection)
+
+
+def ensure_collection_indexes(collection, name: str):
+    """Create the indexes of INDEXES[name] on `collection`, e.g. a staging copy"""
+    for keys, options in INDEXES.get(name, []):
+        collection.create_index(keys, **options)
+
+
+async def ensure_indexes_async(db):
+    """`ensure_indexes` for an AsyncMongoClient database"""
+    for collection, specs in INDEXES.items():
+        for keys, options in specs:
+            await db[collection].create_index(keys, **options)
@@ -0,0 +1,84 @@
+"""One-off migration: convert string 'Start Date' values in activities to BSON dates
+
+Documents loaded before ingest typed Start Date hold the raw CSV string.
+This rewrites them in place with the parsed UTC datetime and the
+preformatted 'Start Date Display', the same fields normalize_records
+produces. Safe to re-run: only documents whose Start Date is still a string
+are touched.
+
+Usage (from mongodb_init/):
+    python migrate_start_dates.py [--batch-size 1000]
+"""
+from pymongo import MongoClient, UpdateOne
+from dotenv import load_dotenv
+import argparse
+import os
+import pandas as pd
+import logging
+from indexes import ensure_indexes
+from schemas import display_dates, parse_dates
+
+load_dotenv()
+
+logging.basicConfig(
+    filename='../logs/automation.log',
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def migrate_batch(collection, batch: list) -> int:
+    dates = parse_dates([doc['Start Date'] for doc in batch])
+    displays = display_dates(dates)
+    operations = []
+    for doc, date, display in zip(batch, dates, displays):
+        if pd.isna(date):
+            # Unparseable: leave the raw value so nothing is lost
+            continue
+        operations.append(UpdateOne(
+            {'_id': doc['_id']},
+            {'$set': {'Start Date': date.to_pydatetime(), 'Start Date Display': display}}
+        ))
+    if not operations:
+        return 0
+    result = collection.bulk_write(operations, ordered=False)
+    return result.modified_count
+
+
+def migrate_start_dates(batch_size: int = 1000):
+    """Convert every string Start Date in activities; returns (migrated, skipped)"""
+    client = MongoClient(os.getenv("MONGO_URI"))
+    db = client['elite_endurance']
+    activities = db['activities']
+    migrated = skipped = 0
+
+    try:
+        cursor = activities.find({'Start Date': {'$type': 'string'}}, {'Start Date': 1})
+        batch = []
+        for doc in cursor:
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                count = migrate_batch(activities, batch)
+                migrated += count
+                skipped += len(batch) - count
+                batch = []
+        if batch:
+            count = migrate_batch(activities, batch)
+            migrated += count
+            skipped += len(batch) - count
+
+        # Index entries now sort by date rather than by string
+        ensure_indexes(db)
+        logger.info(f"Migrated Start Date on {migrated} activities ({skipped} left unparsed)")
+        return migrated, skipped
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--batch-size', type=int, default=1000, help='documents per bulk_write')
+    args = parser.parse_args()
+    migrated, skipped = migrate_start_dates(args.batch_size)
+    print(f"Migrated {migrated} activities, {skipped} unparseable Start Date values left as strings")
@@ -0,0 +1,133 @@
+import logging
+import math
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Column types per collection. Columns not listed are passed through with
+# NaN removal only; `required` columns must be present and non-null.
+SCHEMAS = {
+    'athlete_metadata': {
+        'required': ['Athlete Name'],
+        'int': ['Number_of_events', '2024 Weeks Scraped', 'Athlete ID'],
+        'float': ['Total_Run_Distance_km', 'Avg_Weekly_Run_Mileage_km', 'Total_Run_Hours',
+                  'Avg_Weekly_Run_Hours', 'Total_Ride_Hours', 'Total_Swim_Hours',
+                  'Total_Other_Hours', 'Avg_Run_Pace_min_per_km'],
+        'str': ['Athlete Name', 'Competitor', 'Nat', 'Gender', 'Mark', 'Discipline'],
+        'datetime': [],
+    },
+    'master_iaaf': {
+        'required': ['Competitor'],
+        'int': ['Results Score', 'Athlete ID', 'Number of Runs', 'Number of Bike Rides',
+                '2024 Weeks Scraped'],
+        'float': [],
+        'str': ['Mark', 'Competitor', 'Nat', 'Location', 'Date', 'Discipline', 'Gender',
+                'Date_Created', 'Profile Visibility'],
+        'datetime': [],
+    },
+    'activities': {
+        'required': ['Athlete Name', 'Activity ID'],
+        'int': ['Serial', 'Athlete ID', 'Activity ID', 'Elapsed Time'],
+        'float': ['Pace (min/mi)', 'Pace (min/km)', 'Time (min)', 'Distance (km)',
+                  'Activity Time (s)'],
+        'str': ['Athlete Name', 'Activity Name', 'Description', 'Type', 'Location', 'Time'],
+        # Stored as BSON dates (UTC) with a '<column> Display' string alongside
+        'datetime': ['Start Date'],
+    },
+}
+
+# Display format for datetime columns, precomputed at ingest so pages never parse dates
+DISPLAY_DATE_FORMAT = '%B %d, %Y at %I:%M %p'
+
+
+def _is_missing(value) -> bool:
+    if value is None or value is pd.NA or value is pd.NaT:
+        return True
+    return isinstance(value, float) and not math.isfinite(value)
+
+
+def _native(value):
+    # pymongo cannot encode numpy scalars
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return float(value)
+    if isinstance(value, np.bool_):
+        return bool(value)
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    return value
+
+
+def parse_dates(values) -> pd.Series:
+    """Parse date strings (any mix of ISO formats/offsets) to naive UTC Timestamps
+
+    Unparseable values become NaT. BSON dates carry no timezone and pymongo
+    treats naive datetimes as UTC.
+    """
+    parsed = pd.to_datetime(pd.Series(values), utc=True, format='mixed', errors='coerce')
+    return parsed.dt.tz_localize(None)
+
+
+def display_dates(dates: pd.Series) -> pd.Series:
+    """Format parsed dates with DISPLAY_DATE_FORMAT; NaT stays missing"""
+    return dates.dt.strftime(DISPLAY_DATE_FORMAT).where(dates.notna(), None)
+
+
+def normalize_records(df: pd.DataFrame, collection: str) -> list:
+    """Convert a DataFrame into clean MongoDB documents for `collection`
+
+    - numeric columns are coerced to int/float; unparseable values become missing
+    - datetime columns become UTC datetimes plus a preformatted '<column> Display'
+    - NaN, inf and other missing values are omitted from the document
+    - rows missing a required field are dropped and logged
+    - index artifacts such as 'Unnamed: 0' are dropped
+
+    Documents written this way never contain NaN, so the web app can
+    serialize them without a per-request sanitizing pass.
+
+    Args:
+        df: Data as read from the CSV
+        collection: Key into SCHEMAS
+
+    Returns:
+        List of documents ready for insert_many
+
+    Raises:
+        ValueError: If a required column is missing from `df`
+    """
+    schema = SCHEMAS[collection]
+    missing_columns = [col for col in schema['required'] if col not in df.columns]
+    if missing_columns:
+        raise ValueError(f"{collection}: missing required columns {missing_columns}")
+
+    df = df.drop(columns=[col for col in df.columns if str(col).startswith('Unnamed:')])
+    df = df.copy()
+    for col in schema['int']:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').round().astype('Int64')
+    for col in schema['float']:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').replace([np.inf, -np.inf], np.nan)
+    for col in schema['str']:
+        if col in df.columns:
+            df[col] = df[col].map(lambda v: v.strip() if isinstance(v, str) else (None if _is_missing(v) else str(v)))
+    for col in schema['datetime']:
+        if col in df.columns:
+            df[col] = parse_dates(df[col]).values
+            df[f'{col} Display'] = display_dates(df[col]).values
+
+    documents = []
+    dropped = 0
+    for record in df.to_dict(orient='records'):
+        document = {key: _native(value) for key, value in record.items() if not _is_missing(value)}
+        if any(document.get(col) in (None, '') for col in schema['required']):
+            dropped += 1
+            continue
+        documents.append(document)
+
+    if dropped:
+        logger.warning(f"{collection}: dropped {dropped} rows missing required fields {schema['required']}")
+    return documents
@@ -0,0 +1,325 @@
+"""Embedded SQLite storage backend, built from the same CSVs as MongoDB
+
+Serves the web app from a local file (STORAGE_BACKEND=sqlite) so local
+development, tests and benchmarks need no cluster. Each table keeps the
+normalized document as JSON plus the columns queries filter and sort on,
+indexed to match the MongoDB indexes in indexes.py; lookups are
+single-index reads with no network hop.
+
+Name columns hold str.casefold() of the name and lookups casefold their
+argument, standing in for MongoDB's case-insensitive 'en' collation.
+SQLite's COLLATE NOCASE would only fold ASCII, so "Åsa" would not match
+"åsa". casefold is not a collation: it folds "ß" to "ss", where strength
+2 keeps them distinct.
+
+Build the file from the repo root:
+    python -m mongodb_init.sqlite_store [--output data/elite_endurance.db] [--activities path.csv]
+"""
+import argparse
+import json
+import logging
+import os
+import re
+import sqlite3
+import time
+import uuid
+from datetime import datetime
+
+from mongodb_init.connection import ACTIVITY_PROJECTION, ROSTER_PROJECTION, AsyncStorageBackend, apply_projection
+from mongodb_init.summary import build_summaries, field_name, weekly_totals
+
+logger = logging.getLogger(__name__)
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# collection -> CSV it is built from, as in db_update.SOURCES
+SOURCES = {
+    'athlete_metadata': os.path.join(ROOT_DIR, 'cleaned_athlete_metadata.csv'),
+    'activities': os.path.join(ROOT_DIR, 'indiv_activities_full.csv'),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS athlete_metadata (
+    competitor TEXT,  -- casefolded
+    athlete_name TEXT,  -- casefolded
+    athlete_id INTEGER,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS competitor_ci ON athlete_metadata (competitor);
+CREATE INDEX IF NOT EXISTS athlete_name_ci ON athlete_metadata (athlete_name);
+
+CREATE TABLE IF NOT EXISTS activities (
+    athlete_name TEXT,  -- casefolded
+    athlete_id INTEGER,
+    activity_id INTEGER,
+    start_date TEXT,  -- ISO 8601 UTC, so text order is chronological
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS athlete_name_start_date_activity_ci
+    ON activities (athlete_name, start_date DESC, activity_id DESC);
+CREATE INDEX IF NOT EXISTS athlete_id_start_date ON activities (athlete_id, start_date DESC);
+
+CREATE TABLE IF NOT EXISTS athlete_summary (
+    athlete_id INTEGER PRIMARY KEY,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS run_distance_desc
+    ON athlete_summary (json_extract(doc, '$.types.Run.distance_km') DESC);
+
+CREATE TABLE IF NOT EXISTS update_logs (
+    timestamp TEXT NOT NULL,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS timestamp_desc ON update_logs (timestamp DESC);
+"""
+
+# Document fields stored as datetimes; JSON holds them as ISO strings
+DATETIME_FIELDS = ('Start Date', 'timestamp')
+
+
+def _encode(document: dict) -> str:
+    return json.dumps(
+        {k: v for k, v in document.items() if k != '_id'},
+        default=lambda v: v.isoformat() if isinstance(v, datetime) else str(v),
+    )
+
+
+def _decode(text: str) -> dict:
+    document = json.loads(text)
+    for field in DATETIME_FIELDS:
+        if isinstance(document.get(field), str):
+            document[field] = datetime.fromisoformat(document[field])
+    return document
+
+
+def _fold(name):
+    return name.strip().casefold() if isinstance(name, str) else name
+
+
+def _json_path_key(key: str):
+    """`key` as a JSON path label, or None if SQLite's path syntax cannot express it
+
+    Plain identifiers stay bare so the Run path is spelled exactly as in the
+    run_distance_desc index; others are double-quoted, which has no escape
+    for a '"' inside the key.
+    """
+    if re.fullmatch(r'\w+', key):
+        return key
+    return None if '"' in key else f'"{key}"'
+
+
+def _iso(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def build_database(path: str, athlete_metadata: list, activities: list) -> dict:
+    """Write normalized documents to a new SQLite file at `path`
+
+    The file is built next to `path` and moved into place with os.replace,
+    so a running app never opens a half-written database.
+
+    Returns:
+        The update_logs entry written, with row counts and a new version
+    """
+    started = time.perf_counter()
+    tmp_path = f'{path}.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.executescript(SCHEMA)
+        conn.executemany(
+            'INSERT INTO athlete_metadata (competitor, athlete_name, athlete_id, doc) VALUES (?, ?, ?, ?)',
+            ((_fold(a.get('Competitor')), _fold(a.get('Athlete Name')), a.get('Athlete ID'), _encode(a))
+             for a in athlete_metadata)
+        )
+        conn.executemany(
+            'INSERT INTO activities (athlete_name, athlete_id, activity_id, start_date, doc) VALUES (?, ?, ?, ?, ?)',
+            ((_fold(a.get('Athlete Name')), a.get('Athlete ID'), a.get('Activity ID'), _iso(a.get('Start Date')), _encode(a))
+             for a in activities)
+        )
+        conn.executemany(
+            'INSERT INTO athlete_summary (athlete_id, doc) VALUES (?, ?)',
+            ((athlete_id, _encode(summary)) for athlete_id, summary in build_summaries(activities).items())
+        )
+        log_entry = {
+            'timestamp': datetime.now(),
+            'mode': 'sqlite',
+            'version': uuid.uuid4().hex,
+            'athlete_metadata_count': len(athlete_metadata),
+            'activities_count': len(activities),
+            'duration_s': round(time.perf_counter() - started, 2),
+        }
+        conn.execute('INSERT INTO update_logs (timestamp, doc) VALUES (?, ?)',
+                     (log_entry['timestamp'].isoformat(), _encode(log_entry)))
+        conn.execute('ANALYZE')
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp_path, path)
+    logger.info(f"Built {path}: {len(athlete_metadata)} athletes, {len(activities)} activities")
+    return log_entry
+
+
+class _RowCursor:
+    """Async iteration over a SQLite cursor, fetching `batch_size` rows at a time"""
+    def __init__(self, cursor, batch_size: int):
+        self._cursor = cursor
+        self._batch_size = batch_size
+        self._rows = []
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self._rows:
+            self._rows = self._cursor.fetchmany(self._batch_size)[::-1]
+            if not self._rows:
+                raise StopAsyncIteration
+        return apply_projection(_decode(self._rows.pop()[0]), ACTIVITY_PROJECTION)
+
+    async def close(self):
+        self._cursor.close()
+
+
+class SQLiteDatabaseConnection(AsyncStorageBackend):
+    """AsyncDatabaseConnection interface over a local SQLite file
+
+    Queries are sub-millisecond index reads, so they run inline on the
+    event loop rather than in a thread.
+    """
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            from config.settings import SQLITE_PATH
+            cls._instance = cls(SQLITE_PATH)
+        return cls._instance
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = None
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        return self._conn
+
+    def _docs(self, sql: str, params: tuple = ()) -> list:
+        return [_decode(row[0]) for row in self.conn.execute(sql, params)]
+
+    async def ensure_indexes(self):
+        self.conn.executescript(SCHEMA)
+
+    async def warm_up(self):
+        await self.ensure_indexes()
+
+    async def health(self) -> dict:
+        start = time.perf_counter()
+        self.conn.execute('SELECT 1').fetchone()
+        return {
+            'ping_ms': round((time.perf_counter() - start) * 1000, 3),
+            'storage': {'backend': 'sqlite', 'path': self.path},
+        }
+
+    async def get_athlete_metadata(self, athlete_name: str):
+        docs = self._docs('SELECT doc FROM athlete_metadata WHERE competitor = ? LIMIT 1', (_fold(athlete_name),))
+        return docs[0] if docs else None
+
+    async def get_athlete_activities(self, athlete_name: str):
+        return self._docs('SELECT doc FROM activities WHERE athlete_name = ? ORDER BY start_date DESC',
+                          (_fold(athlete_name),))
+
+    async def get_athlete_activities_page(self, athlete_name: str, limit: int = 50, before=None):
+        sql = 'SELECT doc FROM activities WHERE athlete_name = ?'
+        params = [_fold(athlete_name)]
+        if before is not None:
+            start_date, activity_id = before
+            # NULL start dates sort last, as in MongoDB; see connection._activities_page_query
+            if start_date is None:
+                sql += ' AND start_date IS NULL AND activity_id < ?'
+                params.append(activity_id)
+            else:
+                sql += ' AND (start_date < ? OR start_date IS NULL OR (start_date = ? AND activity_id < ?))'
+                params += [_iso(start_date), _iso(start_date), activity_id]
+        sql += ' ORDER BY start_date DESC, activity_id DESC LIMIT ?'
+        params.append(limit + 1)
+        activities = [apply_projection(doc, ACTIVITY_PROJECTION) for doc in self._docs(sql, tuple(params))]
+        return activities[:limit], len(activities) > limit
+
+    def iter_athlete_activities(self, athlete_name: str, batch_size: int = 200):
+        cursor = self.conn.execute(
+            'SELECT doc FROM activities WHERE athlete_name = ? ORDER BY start_date DESC, activity_id DESC',
+            (_fold(athlete_name),)
+        )
+        return _RowCursor(cursor, batch_size)
+
+    async def get_roster(self):
+        return [apply_projection(doc, ROSTER_PROJECTION) for doc in self._docs('SELECT doc FROM athlete_metadata')]
+
+    async def get_athlete_weekly_totals(self, athlete_id: int):
+        return weekly_totals(self._docs('SELECT doc FROM activities WHERE athlete_id = ?', (athlete_id,)))
+
+    async def get_athlete_summary(self, athlete_id: int):
+        docs = self._docs('SELECT doc FROM athlete_summary WHERE athlete_id = ?', (athlete_id,))
+        if not docs:
+            return None
+        return {'_id': athlete_id, **docs[0]}
+
+    async def get_summary_leaderboard(self, activity_type: str = 'Run', limit: int = 20):
+        field = field_name(activity_type)
+        label = _json_path_key(field)
+        if label is None:
+            # Inexpressible as a path; rank in Python like the in-memory backend
+            summaries = [{'_id': athlete_id, **_decode(doc)}
+                         for athlete_id, doc in self.conn.execute('SELECT athlete_id, doc FROM athlete_summary')]
+            ranked = [s for s in summaries if s.get('types', {}).get(field, {}).get('count', 0) > 0]
+            ranked.sort(key=lambda s: s['types'][field].get('distance_km', 0), reverse=True)
+        else:
+            # Spelled out literally (not bound) so the Run query matches the run_distance_desc index
+            path = f"$.types.{label}".replace("'", "''")
+            rows = self.conn.execute(
+                f"SELECT athlete_id, doc FROM athlete_summary WHERE json_extract(doc, '{path}.count') > 0 "
+                f"ORDER BY json_extract(doc, '{path}.distance_km') DESC LIMIT ?",
+                (limit,)
+            )
+            ranked = [{'_id': athlete_id, **_decode(doc)} for athlete_id, doc in rows]
+        return [
+            {
+                '_id': summary['_id'],
+                'Athlete Name': summary.get('Athlete Name'),
+                'types': {activity_type: summary.get('types', {}).get(field, {})},
+            }
+            for summary in ranked[:limit]
+        ]
+
+    async def get_latest_update_log(self):
+        docs = self._docs('SELECT doc FROM update_logs ORDER BY timestamp DESC LIMIT 1')
+        return docs[0] if docs else None
+
+
+def main():
+    # Only the loader needs pandas; the web app imports this module without it
+    import pandas as pd
+    from config.settings import SQLITE_PATH
+    from mongodb_init.schemas import normalize_records
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', default=SQLITE_PATH, help='SQLite file to write')
+    parser.add_argument('--metadata', default=SOURCES['athlete_metadata'], help='athlete metadata CSV')
+    parser.add_argument('--activities', default=SOURCES['activities'], help='activities CSV')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    log_entry = build_database(
+        args.output,
+        normalize_records(pd.read_csv(args.metadata), 'athlete_metadata'),
+        normalize_records(pd.read_csv(args.activities), 'activities'),
+    )
+    print(f"Wrote {args.output} ({log_entry['activities_count']} activities, version {log_entry['version']})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,193 @@
+"""Materialized per-athlete training totals in the `athlete_summary` collection
+
+One document per Athlete ID holds running totals per activity Type and per
+ISO week and Type:
+
+    {'_id': 26712504, 'Athlete Name': 'Aaron Ahl',
+     'types': {'Run': {'distance_km': 5815.2, 'time_min': 26037.6, 'count': 412}, ...},
+     'weeks': {'2024-W03': {'Run': {'distance_km': 112.4, 'time_min': 498.0, 'count': 9}}, ...}}
+
+The incremental sync applies the change of each inserted, updated or
+deleted activity as a `$inc` delta, so the totals stay current without
+recomputing from the CSV. `rebuild_summary` recomputes everything from
+the activities collection after a full reload.
+"""
+import logging
+from datetime import date, datetime
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+COLLECTION = 'athlete_summary'
+
+# Activity fields the summary is computed from; the sync reads these for changed documents
+SUMMARY_FIELDS = ('Athlete ID', 'Athlete Name', 'Type', 'Start Date', 'Distance (km)', 'Time (min)')
+
+
+def field_name(value) -> str:
+    """Document key for an activity Type"""
+    # Types become document keys, which may not contain '.' or start with '$'
+    return str(value or 'Unknown').replace('.', '_').lstrip('$') or 'Unknown'
+
+
+def _week_key(start_date) -> str:
+    year, week, _ = start_date.isocalendar()
+    return f'{year}-W{week:02d}'
+
+
+def activity_delta(activity: dict, sign: int = 1) -> dict:
+    """`$inc` fields adding (sign=1) or removing (sign=-1) one activity's totals"""
+    activity_type = field_name(activity.get('Type'))
+    values = {
+        'distance_km': sign * (activity.get('Distance (km)') or 0),
+        'time_min': sign * (activity.get('Time (min)') or 0),
+        'count': sign,
+    }
+    delta = {f'types.{activity_type}.{name}': value for name, value in values.items()}
+    if isinstance(activity.get('Start Date'), datetime):
+        week = _week_key(activity['Start Date'])
+        delta.update({f'weeks.{week}.{activity_type}.{name}': value for name, value in values.items()})
+    return delta
+
+
+def summary_updates(added: list, removed: list) -> list:
+    """One upserting UpdateOne per athlete, summing the deltas of `added` and `removed` activities
+
+    An updated activity appears in both lists: its old version in
+    `removed` and its new version in `added`.
+    """
+    increments = {}
+    names = {}
+    for activities, sign in ((added, 1), (removed, -1)):
+        for activity in activities:
+            athlete_id = activity.get('Athlete ID')
+            if not athlete_id:  # 0 marks activities not matched to an athlete
+                continue
+            totals = increments.setdefault(athlete_id, {})
+            for field, value in activity_delta(activity, sign).items():
+                totals[field] = totals.get(field, 0) + value
+            if sign > 0 and activity.get('Athlete Name'):
+                names[athlete_id] = activity['Athlete Name']
+
+    operations = []
+    for athlete_id, totals in increments.items():
+        update = {'$inc': {field: value for field, value in totals.items() if value}}
+        if athlete_id in names:
+            update['$set'] = {'Athlete Name': names[athlete_id]}
+        if update['$inc'] or '$set' in update:
+            operations.append(UpdateOne({'_id': athlete_id}, update, upsert=True))
+    return operations
+
+
+def build_summaries(activities) -> dict:
+    """Summary documents by Athlete ID computed in memory, as the `$inc` deltas would build them"""
+    summaries = {}
+    for activity in activities:
+        athlete_id = activity.get('Athlete ID')
+        if not athlete_id:
+            continue
+        summary = summaries.setdefault(athlete_id, {'_id': athlete_id})
+        if activity.get('Athlete Name'):
+            summary['Athlete Name'] = activity['Athlete Name']
+        for path, value in activity_delta(activity).items():
+            *parents, leaf = path.split('.')
+            node = summary
+            for part in parents:
+                node = node.setdefault(part, {})
+            node[leaf] = node.get(leaf, 0) + value
+    return summaries
+
+
+def weekly_totals(activities) -> list:
+    """Python equivalent of connection.weekly_totals_pipeline for one athlete's activities"""
+    totals = {}
+    for activity in activities:
+        if not isinstance(activity.get('Start Date'), datetime):
+            continue
+        year, week, _ = activity['Start Date'].isocalendar()
+        row = totals.setdefault((year, week, activity.get('Type') or ''), {
+            'year': year, 'week': week,
+            'week_start': date.fromisocalendar(year, week, 1).isoformat(),
+            'type': activity.get('Type'), 'distance_km': 0.0, 'time_min': 0.0, 'count': 0,
+        })
+        row['distance_km'] += activity.get('Distance (km)') or 0
+        row['time_min'] += activity.get('Time (min)') or 0
+        row['count'] += 1
+    rows = [totals[key] for key in sorted(totals)]
+    for row in rows:
+        row['distance_km'] = round(row['distance_km'], 2)
+        row['time_min'] = round(row['time_min'], 1)
+    return rows
+
+
+def apply_summary_changes(db, added: list, removed: list, batch_size: int = 1000) -> int:
+    """Apply activity changes to athlete_summary; returns the number of athletes touched"""
+    operations = summary_updates(added, removed)
+    for start in range(0, len(operations), batch_size):
+        db[COLLECTION].bulk_write(operations[start:start + batch_size], ordered=False)
+    if operations:
+        logger.info(f"Updated {COLLECTION} for {len(operations)} athletes")
+    return len(operations)
+
+
+def rebuild_summary(db, batch_size: int = 1000, indexes: list = ()) -> int:
+    """Recompute athlete_summary from every activity and swap it in atomically
+
+    Args:
+        indexes: (keys, options) specs, as in indexes.INDEXES, built on the
+            staged copy before the swap so the leaderboard never scans it
+    """
+    projection = {field: 1 for field in SUMMARY_FIELDS}
+    projection['_id'] = 0
+    staging = db[COLLECTION + '_staging']
+    staging.drop()
+    operations = summary_updates(list(db['activities'].find({}, projection)), [])
+    for start in range(0, len(operations), batch_size):
+        staging.bulk_write(operations[start:start + batch_size], ordered=False)
+    for keys, options in indexes:
+        staging.create_index(keys, **options)
+    # With no activities the old totals are stale too: swap in the empty copy
+    # (create_index created it), or drop the summary if nothing was created
+    if operations or indexes:
+        staging.rename(COLLECTION, dropTarget=True)
+    else:
+        db[COLLECTION].drop()
+    logger.info(f"Rebuilt {COLLECTION} for {len(operations)} athletes")
+    return len(operations)
+
+
+def leaderboard_query(activity_type: str) -> tuple:
+    """(filter, projection, sort) ranking athletes by total distance for `activity_type`"""
+    field = f'types.{field_name(activity_type)}'
+    return (
+        {f'{field}.count': {'$gt': 0}},
+        {'_id': 1, 'Athlete Name': 1, field: 1},
+        [(f'{field}.distance_km', -1)],
+    )
+
+
+def summary_stats(summary: dict) -> dict:
+    """Athlete-page totals from a summary document, named like the athlete_metadata fields
+
+    The weekly average spans every ISO week from the first to the last
+    week with a run, including weeks without one. This differs from the
+    offline calculate_athlete_metrics, which divides by the `end_week`
+    number it was run for. Without dated runs (Start Date still a string)
+    it is left out, so the athlete_metadata value stays.
+    """
+    run = summary.get('types', {}).get('Run', {})
+    distance = run.get('distance_km', 0)
+    minutes = run.get('time_min', 0)
+    stats = {
+        'Total_Run_Distance_km': round(distance, 2),
+        'Total_Run_Hours': round(minutes / 60, 2),
+        'Avg_Run_Pace_min_per_km': round(minutes / distance, 2) if distance else 0,
+    }
+    run_weeks = [week for week, types in summary.get('weeks', {}).items()
+                 if types.get('Run', {}).get('count', 0) > 0]
+    if run_weeks:
+        first, last = (date.fromisocalendar(int(w[:4]), int(w[6:]), 1) for w in (min(run_weeks), max(run_weeks)))
+        span_weeks = (last - first).days // 7 + 1
+        stats['Avg_Weekly_Run_Mileage_km'] = round(distance / span_weeks, 2)
+    return stats
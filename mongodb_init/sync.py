@@ -0,0 +1,148 @@
+"""Incremental sync of normalized CSV documents into a MongoDB collection
+
+Instead of drop-and-reload, each run diffs the desired documents against
+the collection by a natural key and only writes the difference:
+
+- documents whose key is new are inserted
+- documents whose content changed are replaced in place (same _id)
+- documents whose key no longer appears in the CSV are deleted, unless
+  that would remove more than `max_delete_fraction` of the collection
+
+Change detection compares a content hash stored on each document
+('_sync_hash'), so the diff reads only keys and hashes from MongoDB, not
+whole documents. Documents written before hashes existed are replaced once
+on the first incremental run.
+"""
+import hashlib
+import json
+import logging
+
+from pymongo import DeleteOne, InsertOne, ReplaceOne
+
+logger = logging.getLogger(__name__)
+
+HASH_FIELD = '_sync_hash'
+
+# Share of a collection one incremental run may delete. A truncated CSV, or
+# one whose key column normalize_records dropped, would otherwise wipe it.
+MAX_DELETE_FRACTION = 0.05
+
+# Natural key per collection: Strava activity, athlete, and IAAF performance.
+# Athlete ID alone is not unique in athlete_metadata (unmatched athletes share 0).
+SYNC_KEYS = {
+    'activities': ('Activity ID',),
+    'athlete_metadata': ('Athlete ID', 'Athlete Name'),
+    'master_iaaf': ('Competitor', 'Discipline', 'Mark', 'Date'),
+}
+
+
+def content_hash(document: dict) -> str:
+    """Stable hash of a document's fields, ignoring _id and the hash itself"""
+    fields = {k: v for k, v in document.items() if k not in ('_id', HASH_FIELD)}
+    return hashlib.sha1(json.dumps(fields, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def add_sync_hashes(documents: list) -> list:
+    """Stamp each document with its content hash (in place); returns `documents`"""
+    for document in documents:
+        document[HASH_FIELD] = content_hash(document)
+    return documents
+
+
+def _key(document: dict, key_fields: tuple):
+    return tuple(document.get(field) for field in key_fields)
+
+
+def plan_sync(existing: list, documents: list, key_fields: tuple) -> tuple:
+    """Diff `documents` against `existing` ({_id, key fields, hash} dicts)
+
+    Returns (operations, counts, added, removed): counts holds the number
+    of planned inserts, updates, deletes and unchanged documents; `added`
+    are the new versions of inserted and updated documents and `removed`
+    the existing versions of updated and deleted ones. Documents missing a
+    key field are skipped; duplicate keys keep the last row, as a reload of
+    the CSV would show the last row last.
+    """
+    desired = {}
+    skipped = 0
+    for document in documents:
+        key = _key(document, key_fields)
+        if any(value is None for value in key):
+            skipped += 1
+            continue
+        desired[key] = document
+    if skipped:
+        logger.warning(f"Skipped {skipped} rows missing sync key {key_fields}")
+
+    current = {}
+    operations = []
+    added, removed = [], []
+    counts = {'inserted': 0, 'updated': 0, 'deleted': 0, 'unchanged': 0}
+    for document in existing:
+        key = _key(document, key_fields)
+        if key in current or key not in desired:
+            # Duplicate of a key already matched, or gone from the CSV
+            operations.append(DeleteOne({'_id': document['_id']}))
+            removed.append(document)
+            counts['deleted'] += 1
+        else:
+            current[key] = document
+
+    for key, document in desired.items():
+        document = dict(document, **{HASH_FIELD: content_hash(document)})
+        match = current.get(key)
+        if match is None:
+            operations.append(InsertOne(document))
+            added.append(document)
+            counts['inserted'] += 1
+        elif match.get(HASH_FIELD) != document[HASH_FIELD]:
+            operations.append(ReplaceOne({'_id': match['_id']}, document))
+            added.append(document)
+            removed.append(match)
+            counts['updated'] += 1
+        else:
+            counts['unchanged'] += 1
+    return operations, counts, added, removed
+
+
+def sync_collection(collection, documents: list, key_fields: tuple, batch_size: int = 1000,
+                    track_fields: tuple = (), on_change=None,
+                    max_delete_fraction: float = MAX_DELETE_FRACTION) -> dict:
+    """Bring `collection` in line with `documents` using unordered bulk writes
+
+    Args:
+        collection: pymongo Collection to update
+        documents: Normalized documents (see schemas.normalize_records)
+        key_fields: Fields identifying a document, e.g. SYNC_KEYS['activities']
+        batch_size: Operations per bulk_write call
+        track_fields: Extra fields read from existing documents for `on_change`
+        on_change: Called as on_change(added, removed) after the writes, with
+            the new and old versions of every changed document
+        max_delete_fraction: Refuse to run when more than this share of the
+            collection would be deleted; None disables the check
+
+    Returns:
+        Counts of inserted, updated, deleted and unchanged documents
+
+    Raises:
+        ValueError: If the planned deletes exceed `max_delete_fraction`; nothing is written
+    """
+    projection = {field: 1 for field in key_fields + tuple(track_fields)}
+    projection[HASH_FIELD] = 1
+    existing = list(collection.find({}, projection))
+    operations, counts, added, removed = plan_sync(existing, documents, key_fields)
+    if max_delete_fraction is not None and counts['deleted'] > max_delete_fraction * len(existing):
+        raise ValueError(
+            f"{collection.name}: sync would delete {counts['deleted']} of {len(existing)} documents "
+            f"(limit {max_delete_fraction:.0%}); check the CSV, or rerun with --allow-mass-delete or --full"
+        )
+
+    # Unordered, so one bad document doesn't stop the rest of the batch
+    for start in range(0, len(operations), batch_size):
+        collection.bulk_write(operations[start:start + batch_size], ordered=False)
+    if on_change is not None and (added or removed):
+        on_change(added, removed)
+
+    logger.info(f"Synced {collection.name}: {counts['inserted']} inserted, {counts['updated']} updated, "
+                f"{counts['deleted']} deleted, {counts['unchanged']} unchanged")
+    return counts
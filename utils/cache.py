@@ -0,0 +1,138 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+
+
+class DataVersion:
+    """Track the data version from the latest `update_logs` entry
+
+    `fetch_latest_log` is a coroutine function. The log is re-read from
+    MongoDB at most once every `ttl` seconds, so version checks stay cheap
+    on the hot path. A sync job writes a new log entry, which changes the
+    version and invalidates any versioned cache.
+    """
+    def __init__(self, fetch_latest_log, ttl: float = 30):
+        self._fetch_latest_log = fetch_latest_log
+        self._ttl = ttl
+        self._lock = None
+        self._log = None
+        self._checked_at = None
+
+    def _is_fresh(self, now) -> bool:
+        return self._checked_at is not None and now - self._checked_at < self._ttl
+
+    async def latest_log(self):
+        """Return the latest update log, refreshing it once the TTL expires"""
+        if self._is_fresh(time.monotonic()):
+            return self._log
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            # Another request may have refreshed the log while we waited
+            if not self._is_fresh(time.monotonic()):
+                try:
+                    self._log = await self._fetch_latest_log()
+                except Exception as e:
+                    # Keep serving the last known version if MongoDB is unreachable
+                    print(f"Error reading latest update log: {e}")
+                self._checked_at = time.monotonic()
+            return self._log
+
+    async def current(self) -> str:
+        """Return the current data version as a string key"""
+        log = await self.latest_log()
+        if not log:
+            return 'unversioned'
+        return str(log.get('version') or log['timestamp'].isoformat())
+
+    def refresh(self):
+        """Force the next version check to hit MongoDB"""
+        self._checked_at = None
+
+
+class VersionedCache:
+    """Hold a single value that is rebuilt only when the data version changes
+
+    `builder` is a coroutine function called with the new version. The
+    cache is shared by every request in the worker. Concurrent requests
+    that arrive while a rebuild is running wait for it instead of starting
+    their own.
+    """
+    def __init__(self, builder):
+        self._builder = builder
+        self._lock = None
+        self._version = None
+        self._value = None
+
+    async def get(self, version: str):
+        """Return the value for `version`, building it on first use"""
+        if self._version == version:
+            return self._value
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._version != version:
+                self._value = await self._builder(version)
+                self._version = version
+            return self._value
+
+    def invalidate(self):
+        """Drop the cached value so the next `get` rebuilds it"""
+        self._version = None
+        self._value = None
+
+
+class LRUCache:
+    """Bounded mapping that evicts the least recently used entry when full
+
+    Tracks hits, misses and evictions so cache effectiveness can be
+    monitored.
+    """
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
@@ -1,8 +1,13 @@
 from bson import ObjectId
 import json
-from datetime import datetime
+from datetime import date, datetime
 import math
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; dumps_json falls back to the stdlib encoder
+    orjson = None
+
 class MongoJSONEncoder(json.JSONEncoder):
     """Custom JSON encoder for MongoDB specific types"""
     def default(self, obj):
@@ -21,6 +26,79 @@ class MongoJSONEncoder(json.JSONEncoder):
             print(f"JSON Encoder Error: {str(e)}")
             raise
 
+# Type dispatch for values the JSON encoders don't handle natively
+_JSON_ENCODERS = {
+    ObjectId: str,
+    datetime: datetime.isoformat,
+    date: date.isoformat,
+}
+
+
+def _encode_default(obj):
+    encoder = _JSON_ENCODERS.get(type(obj))
+    if encoder is None:
+        # Subclasses (e.g. pandas Timestamp) miss the exact-type lookup
+        for typ, candidate in _JSON_ENCODERS.items():
+            if isinstance(obj, typ):
+                encoder = candidate
+                break
+        else:
+            raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+    return encoder(obj)
+
+
+# Types json.dumps writes as-is; everything else is checked by _to_json_safe
+_JSON_NATIVE = frozenset({str, int, bool, type(None)})
+
+
+def _to_json_safe(data):
+    """Copy `data` with NaN/inf as None and ObjectId/datetime as strings, without recursion
+
+    Converting everything in one pass lets the stdlib encoder run without a
+    Python `default` hook and without retrying when it meets a NaN.
+    """
+    root = [data]
+    stack = [root]
+    while stack:
+        container = stack.pop()
+        keys = list(container) if type(container) is dict else range(len(container))
+        for key in keys:
+            value = container[key]
+            if type(value) in _JSON_NATIVE:
+                continue
+            if isinstance(value, float):
+                if not math.isfinite(value):
+                    container[key] = None
+            elif isinstance(value, dict):
+                value = container[key] = dict(value)
+                stack.append(value)
+            elif isinstance(value, (list, tuple)):
+                value = container[key] = list(value)
+                stack.append(value)
+            else:
+                container[key] = _encode_default(value)
+    return root[0]
+
+
+def dumps_json(data) -> bytes:
+    """Serialize MongoDB data straight to JSON bytes in a single pass
+
+    ObjectId and datetime values are handled by a type-dispatch table and
+    NaN/inf become null, so results need no prior mongo_to_json_serializable
+    walk. Uses orjson when it is installed.
+
+    Args:
+        data: MongoDB document(s) or any JSON-like structure
+
+    Returns:
+        UTF-8 encoded JSON
+    """
+    if orjson is not None:
+        # orjson writes NaN/inf as null natively
+        return orjson.dumps(data, default=_encode_default, option=orjson.OPT_NON_STR_KEYS)
+    # ASCII output keeps the C encoder on its fastest path
+    return json.dumps(_to_json_safe(data), allow_nan=False, separators=(',', ':')).encode()
+
 def mongo_to_json_serializable(data):
     """Convert MongoDB data to JSON-serializable format
     
@@ -118,4 +196,35 @@ def sanitize_mongo_data(data):
         return data
     except Exception as e:
         print(f"Data Sanitization Error: {str(e)}")
-        return None
\ No newline at end of file
+        return None
+
+def encode_roster(athletes: list, country_coords: dict = None) -> dict:
+    """Encode the slim roster into a compact, dictionary-encoded wire format
+
+    Nat and Discipline repeat heavily across athletes, so each distinct
+    value is sent once and rows refer to it by index. Rows are positional
+    arrays rather than objects, which drops the per-athlete key names.
+
+    Args:
+        athletes: Roster documents with Athlete Name, Competitor, Nat and Discipline
+        country_coords: Mapping of country code to {'lat': ..., 'lng': ...};
+            `coords` is left out when not given (search results)
+
+    Returns:
+        Dict with `nats`, `coords` (parallel to `nats`), `disciplines` and
+        `rows` of [Athlete Name, Competitor, nat index, discipline index]
+    """
+    nats, disciplines = {}, {}
+    rows = []
+    for athlete in athletes:
+        nat_index = nats.setdefault(athlete.get('Nat'), len(nats))
+        discipline_index = disciplines.setdefault(athlete.get('Discipline'), len(disciplines))
+        rows.append([athlete.get('Athlete Name'), athlete.get('Competitor'), nat_index, discipline_index])
+    encoded = {'nats': list(nats), 'disciplines': list(disciplines), 'rows': rows}
+    if country_coords is not None:
+        coords = []
+        for nat in nats:
+            coord = country_coords.get(nat)
+            coords.append([coord['lat'], coord['lng']] if coord else None)
+        encoded['coords'] = coords
+    return encoded
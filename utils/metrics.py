@@ -0,0 +1,302 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+# Seconds; covers cache hits (sub-millisecond) through slow Atlas round trips
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels: tuple, values: tuple) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in zip(labels, values)) + '}'
+
+
+class Histogram:
+    """Cumulative-bucket histogram with one series per label combination"""
+    def __init__(self, name: str, help_text: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._series = {}  # label values -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> list:
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            items = sorted(self._series.items())
+        for label_values, series in items:
+            for bound, count in zip(self.buckets, series):
+                bucket_labels = _format_labels(self.labels + ('le',), label_values + (repr(bound),))
+                lines.append(f'{self.name}_bucket{bucket_labels} {count}')
+            inf_labels = _format_labels(self.labels + ('le',), label_values + ('+Inf',))
+            lines.append(f'{self.name}_bucket{inf_labels} {series[-1]}')
+            labels = _format_labels(self.labels, label_values)
+            lines.append(f'{self.name}_sum{labels} {series[-2]}')
+            lines.append(f'{self.name}_count{labels} {series[-1]}')
+        return lines
+
+
+class Counter:
+    """Monotonic counter with one series per label combination"""
+    def __init__(self, name: str, help_text: str, labels: tuple = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def inc(self, amount: float = 1, *label_values):
+        with self._lock:
+            self._series[label_values] = self._series.get(label_values, 0) + amount
+
+    def render(self) -> list:
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        with self._lock:
+            items = sorted(self._series.items())
+        for label_values, value in items:
+            lines.append(f'{self.name}{_format_labels(self.labels, label_values)} {value}')
+        return lines
+
+
+class MetricsRegistry:
+    """Request, MongoDB and span metrics, rendered in Prometheus text format"""
+    def __init__(self):
+        self.request_latency = Histogram(
+            'http_request_duration_seconds', 'HTTP request latency by route',
+            labels=('method', 'route', 'status'))
+        self.db_latency = Histogram(
+            'mongodb_command_duration_seconds', 'MongoDB command latency by collection',
+            labels=('collection', 'command'))
+        self.db_documents = Counter(
+            'mongodb_documents_returned_total', 'Documents returned by MongoDB commands',
+            labels=('collection', 'command'))
+        self.db_failures = Counter(
+            'mongodb_command_failures_total', 'Failed MongoDB commands',
+            labels=('collection', 'command'))
+        self.span_latency = Histogram(
+            'span_duration_seconds', 'Time spent in instrumented code spans (serialization, rendering)',
+            labels=('span',))
+        self._collectors = []
+
+    def add_collector(self, collect):
+        """Register a callable returning extra Prometheus lines at scrape time"""
+        self._collectors.append(collect)
+
+    @contextmanager
+    def span(self, name: str):
+        """Time the enclosed block, e.g. `with metrics.span('render_athlete_page'):`"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.span_latency.observe(time.perf_counter() - start, name)
+
+    def render(self) -> str:
+        lines = []
+        for metric in (self.request_latency, self.db_latency, self.db_documents,
+                       self.db_failures, self.span_latency):
+            lines.extend(metric.render())
+        for collect in self._collectors:
+            lines.extend(collect())
+        return '\n'.join(lines) + '\n'
+
+
+metrics = MetricsRegistry()
+
+
+def _reply_document_count(reply) -> int:
+    cursor = reply.get('cursor') if isinstance(reply, dict) else None
+    if isinstance(cursor, dict):
+        batch = cursor.get('firstBatch', cursor.get('nextBatch'))
+        return len(batch) if batch is not None else 0
+    return 0
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """pymongo listener recording per-collection command latency and documents returned
+
+    Pass an instance to the client via `event_listeners=[...]`.
+    """
+    def __init__(self, registry: MetricsRegistry = metrics):
+        self.registry = registry
+        self._lock = threading.Lock()
+        self._inflight = {}  # (connection, request id) -> collection
+
+    @staticmethod
+    def _collection(event) -> str:
+        if event.command_name == 'getMore':
+            return str(event.command.get('collection', 'unknown'))
+        target = event.command.get(event.command_name)
+        return target if isinstance(target, str) else 'admin'
+
+    def started(self, event):
+        with self._lock:
+            self._inflight[(event.connection_id, event.request_id)] = self._collection(event)
+
+    def _finish(self, event) -> str:
+        with self._lock:
+            return self._inflight.pop((event.connection_id, event.request_id), 'unknown')
+
+    def succeeded(self, event):
+        collection = self._finish(event)
+        self.registry.db_latency.observe(event.duration_micros / 1e6, collection, event.command_name)
+        documents = _reply_document_count(event.reply)
+        if documents:
+            self.registry.db_documents.inc(documents, collection, event.command_name)
+
+    def failed(self, event):
+        collection = self._finish(event)
+        self.registry.db_latency.observe(event.duration_micros / 1e6, collection, event.command_name)
+        self.registry.db_failures.inc(1, collection, event.command_name)
+
+
+class MongoPoolMetrics(monitoring.ConnectionPoolListener):
+    """pymongo listener tracking connection pool usage per server
+
+    Keeps open/checked-out gauges for /healthz and records how long
+    requests wait to check out a connection. Pass an instance to the
+    client via `event_listeners=[...]`.
+    """
+    def __init__(self, registry: MetricsRegistry = metrics):
+        self.registry = registry
+        self.checkout_latency = Histogram(
+            'mongodb_pool_checkout_duration_seconds', 'Time spent waiting for a pooled connection',
+            labels=('address',))
+        self._lock = threading.Lock()
+        self._pools = {}  # address -> counts
+        registry.add_collector(self.render)
+
+    def _pool(self, address) -> dict:
+        key = f'{address[0]}:{address[1]}'
+        pool = self._pools.get(key)
+        if pool is None:
+            pool = self._pools[key] = {'open': 0, 'checked_out': 0, 'created': 0,
+                                       'closed': 0, 'checkout_failures': 0, 'cleared': 0}
+        return pool
+
+    def _update(self, address, **deltas):
+        with self._lock:
+            pool = self._pool(address)
+            for name, delta in deltas.items():
+                pool[name] += delta
+
+    def stats(self) -> dict:
+        """Current counts per server address"""
+        with self._lock:
+            return {address: dict(pool) for address, pool in self._pools.items()}
+
+    def pool_created(self, event):
+        self._update(event.address)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._update(event.address, cleared=1)
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._update(event.address, open=1, created=1)
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._update(event.address, open=-1, closed=1)
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        self._update(event.address, checkout_failures=1)
+
+    def connection_checked_out(self, event):
+        self._update(event.address, checked_out=1)
+        duration = getattr(event, 'duration', None)  # Reported by pymongo >= 4.7
+        if duration is not None:
+            self.checkout_latency.observe(duration, f'{event.address[0]}:{event.address[1]}')
+
+    def connection_checked_in(self, event):
+        self._update(event.address, checked_out=-1)
+
+    def render(self) -> list:
+        lines = self.checkout_latency.render()
+        stats = self.stats()
+        for name, kind in (('open', 'gauge'), ('checked_out', 'gauge'),
+                           ('created', 'counter'), ('checkout_failures', 'counter')):
+            metric = f'mongodb_pool_connections_{name}' + ('_total' if kind == 'counter' else '')
+            lines.append(f'# TYPE {metric} {kind}')
+            for address, pool in sorted(stats.items()):
+                lines.append(f'{metric}{_format_labels(("address",), (address,))} {pool[name]}')
+        return lines
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route latency and logging slow requests
+
+    Latency is labelled with the route template (e.g. /athlete/{name}),
+    not the raw path, so series stay bounded.
+    """
+    def __init__(self, app, registry: MetricsRegistry = metrics, slow_request_seconds: float = 0.5):
+        self.app = app
+        self.registry = registry
+        self.slow_request_seconds = slow_request_seconds
+        self._route_paths = {}
+
+    def _route_template(self, scope) -> str:
+        endpoint = scope.get('endpoint')
+        if endpoint is None:
+            return 'unmatched'
+        path = self._route_paths.get(endpoint)
+        if path is None:
+            for route in getattr(scope.get('app'), 'routes', ()):
+                if getattr(route, 'endpoint', None) is not None and hasattr(route, 'path'):
+                    self._route_paths[route.endpoint] = route.path
+            path = self._route_paths.get(endpoint, 'unmatched')
+        return path
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            route = self._route_template(scope)
+            self.registry.request_latency.observe(duration, scope['method'], route, str(status))
+            if duration > self.slow_request_seconds:
+                logger.warning(f"Slow request: {scope['method']} {scope['path']} ({route}) "
+                               f"took {duration * 1000:.1f} ms, status {status}")
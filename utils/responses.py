@@ -0,0 +1,65 @@
+import gzip
+import hashlib
+from starlette.responses import Response
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+
+def _accepted_encodings(accept_encoding: str) -> set:
+    """Parse an Accept-Encoding header into the set of acceptable codings"""
+    accepted = set()
+    for part in accept_encoding.split(','):
+        coding, _, params = part.strip().partition(';')
+        if not coding:
+            continue
+        if params.strip().replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+class PrecompressedBody:
+    """A response body compressed once up front and served with a strong ETag
+
+    Built once per data version, so every request only has to pick the
+    right encoding or answer a conditional request with 304. The ETag is a
+    digest of the body itself, so a deploy that changes the output without
+    a new data version still invalidates cached copies.
+    """
+    def __init__(self, body: bytes, name: str, media_type: str = 'application/json'):
+        self.media_type = media_type
+        digest = hashlib.sha1(body).hexdigest()[:16]
+        self.etag = f'"{name}-{digest}"'
+        self.variants = {'identity': body, 'gzip': gzip.compress(body, compresslevel=9)}
+        if brotli is not None:
+            self.variants['br'] = brotli.compress(body, quality=11)
+
+    def _etag_for(self, encoding: str) -> str:
+        # Each representation needs its own strong validator
+        if encoding == 'identity':
+            return self.etag
+        return self.etag[:-1] + f'-{encoding}"'
+
+    def _matches(self, if_none_match: str) -> bool:
+        if if_none_match.strip() == '*':
+            return True
+        tags = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+        return any(self._etag_for(encoding) in tags for encoding in self.variants)
+
+    def response(self, request) -> Response:
+        """Serve the best encoding the client accepts, or 304 if it is current"""
+        accepted = _accepted_encodings(request.headers.get('accept-encoding', ''))
+        encoding = next((e for e in ('br', 'gzip') if e in self.variants and e in accepted), 'identity')
+        headers = {
+            'ETag': self._etag_for(encoding),
+            'Cache-Control': 'public, no-cache',
+            'Vary': 'Accept-Encoding',
+        }
+        if self._matches(request.headers.get('if-none-match', '')):
+            return Response(status_code=304, headers=headers)
+        if encoding != 'identity':
+            headers['Content-Encoding'] = encoding
+        return Response(self.variants[encoding], media_type=self.media_type, headers=headers)
@@ -0,0 +1,130 @@
+import bisect
+import re
+import threading
+import unicodedata
+
+SEARCH_FIELDS = ('Athlete Name', 'Competitor', 'Nat', 'Discipline')
+_TOKEN_SPLIT = re.compile(r'[^0-9a-z]+')
+
+_APOSTROPHES = "'\u2019\u02bc`"
+_APOSTROPHE = re.compile(f'[{_APOSTROPHES}]')
+
+# Applied after casefold: letters NFKD leaves whole become their base letters,
+# and apostrophes are dropped so "D'Amato" folds to "damato"
+_FOLD_TABLE = str.maketrans({
+    'ø': 'o', 'ł': 'l', 'đ': 'd', 'ð': 'd', 'þ': 'th', 'æ': 'ae', 'œ': 'oe', 'ı': 'i', 'ħ': 'h',
+    **{apostrophe: None for apostrophe in _APOSTROPHES},
+})
+
+
+def fold(text) -> str:
+    """Casefold `text`, strip accents and drop apostrophes (Bjørn -> bjorn, D'Amato -> damato)"""
+    if not isinstance(text, str):
+        return ''
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).casefold().translate(_FOLD_TABLE)
+
+
+def tokenize(text) -> list:
+    return [token for token in _TOKEN_SPLIT.split(fold(text)) if token]
+
+
+def index_tokens(text) -> set:
+    """Tokens a field is indexed under: D'Amato is found by both damato and amato"""
+    tokens = set(tokenize(text))
+    if isinstance(text, str) and _APOSTROPHE.search(text):
+        tokens.update(tokenize(_APOSTROPHE.sub(' ', text)))
+    return tokens
+
+
+class AthleteSearchIndex:
+    """In-memory prefix index over the athlete roster
+
+    Every indexed field is folded and split into tokens. Tokens are kept in a
+    sorted list, so all tokens starting with a query prefix are found with two
+    binary searches. `sync` diffs a fresh roster against the indexed one and
+    only touches athletes that were added, removed or changed.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}    # key -> (fingerprint, result dict, rank name)
+        self._postings = {}   # token -> set of keys
+        self._tokens = []     # sorted list of every token in _postings
+
+    @staticmethod
+    def _key(doc) -> tuple:
+        return (doc.get('Competitor'), doc.get('Athlete Name'))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _add(self, key, doc, fingerprint):
+        result = {field: doc.get(field) for field in SEARCH_FIELDS}
+        self._entries[key] = (fingerprint, result, fold(doc.get('Athlete Name')))
+        for token in {t for field in SEARCH_FIELDS for t in index_tokens(doc.get(field))}:
+            keys = self._postings.get(token)
+            if keys is None:
+                keys = self._postings[token] = set()
+                bisect.insort(self._tokens, token)
+            keys.add(key)
+
+    def _remove(self, key):
+        _, result, _ = self._entries.pop(key)
+        for token in {t for field in SEARCH_FIELDS for t in index_tokens(result.get(field))}:
+            keys = self._postings[token]
+            keys.discard(key)
+            if not keys:
+                del self._postings[token]
+                del self._tokens[bisect.bisect_left(self._tokens, token)]
+
+    def sync(self, docs) -> dict:
+        """Bring the index in line with `docs`, returning added/removed/updated counts"""
+        incoming = {}
+        for doc in docs:
+            incoming[self._key(doc)] = doc
+        counts = {'added': 0, 'removed': 0, 'updated': 0}
+        with self._lock:
+            for key in [k for k in self._entries if k not in incoming]:
+                self._remove(key)
+                counts['removed'] += 1
+            for key, doc in incoming.items():
+                fingerprint = tuple(doc.get(field) for field in SEARCH_FIELDS)
+                existing = self._entries.get(key)
+                if existing is not None:
+                    if existing[0] == fingerprint:
+                        continue
+                    self._remove(key)
+                    counts['updated'] += 1
+                else:
+                    counts['added'] += 1
+                self._add(key, doc, fingerprint)
+        return counts
+
+    def _prefix_matches(self, prefix) -> set:
+        start = bisect.bisect_left(self._tokens, prefix)
+        end = bisect.bisect_left(self._tokens, prefix + '\uffff')
+        matches = set()
+        for token in self._tokens[start:end]:
+            matches |= self._postings[token]
+        return matches
+
+    def search(self, query: str, limit: int = 10) -> list:
+        """Return up to `limit` athletes matching every token of `query` as a prefix
+
+        Athletes whose name starts with the query rank first, then by name.
+        """
+        query_tokens = tokenize(query)
+        if not query_tokens:
+            return []
+        folded_query = fold(query).strip()
+        with self._lock:
+            keys = None
+            # Narrowest (longest) prefix first keeps the intersections small
+            for token in sorted(query_tokens, key=len, reverse=True):
+                matches = self._prefix_matches(token)
+                keys = matches if keys is None else keys & matches
+                if not keys:
+                    return []
+            entries = [self._entries[key] for key in keys]
+        entries.sort(key=lambda entry: (not entry[2].startswith(folded_query), entry[2]))
+        return [result for _, result, _ in entries[:limit]]